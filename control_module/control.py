@@ -8,6 +8,9 @@ import threading
 from RPLCD.i2c import CharLCD
 from datetime import datetime, timedelta
 from control_module.buzzer_utils import play_melody
+from control_module.lcd_utils import LcdWriter
+from control_module.motion_utils import MotionProfile, MotionController
+from concurrent.futures import wait
 
 
 # === SETUP ===
@@ -21,8 +24,16 @@ servo.value = 0
 sleep(0.3)
 servo.detach()
 
+# Door moves run in the background with ramped starts and stops, same travel as the old fixed sleeps
+motion = MotionController(servo)
+DOOR_OPEN = MotionProfile(speed=0.08, travel_time=2.1)
+DOOR_CLOSE = MotionProfile(speed=-0.11, travel_time=2.6)
+melody_lock = threading.Lock()
+
 # LCD (adjust I2C address if needed)
 lcd = CharLCD('PCF8574', 0x27)
+# Only this writer talks to the LCD, so the photo button and scheduler threads never fight over the bus
+lcd_writer = LcdWriter(lcd)
 
 # RTC (DS3231)
 i2c = busio.I2C(board.SCL, board.SDA)
@@ -37,6 +48,10 @@ test_lock = threading.Lock()
 def handle_test_press():
     if test_lock.locked():
         return  
+    # Reversing mid-move would run a full-length move from a partial position and over-travel the rack
+    if motion.busy:
+        print("Test mode: door still moving, ignoring press")
+        return
 
     with test_lock:
         if test_toggle[0]:
@@ -58,30 +73,38 @@ def setup_test_button():
 # === FUNCTIONS ===
 
 def lcd_message(line1="", line2=""):
-    lcd.clear()
-    lcd.cursor_pos = (0, 0)
-    lcd.write_string(line1[:16])
-    lcd.cursor_pos = (1, 0)
-    lcd.write_string(line2[:16])
+    lcd_writer.show(line1, line2)  # returns at once, the writer thread sends only what changed
+
+def play_melody_in_background():
+    # Skip if the melody is already playing (e.g. the test button pressed twice)
+    if not melody_lock.acquire(blocking=False):
+        return
+
+    def play():
+        try:
+            play_melody()
+        finally:
+            melody_lock.release()
+
+    threading.Thread(target=play, daemon=True).start()
+
+def report_move(name):
+    def done(completed):
+        print(f"{name} {'done' if completed else 'interrupted'}")
+    return done
 
 def open_door():
+    """Start opening and return at once; the returned future resolves when the door stops"""
     print("Opening door...")
     lcd_message("Opening door...")
-    servo.value = 0.08
-    sleep(2.1)
-    servo.value = 0
-    sleep(0.3)
-    servo.detach()
-    play_melody()
+    play_melody_in_background()  # the tune plays while the door moves
+    return motion.move(DOOR_OPEN, on_done=report_move("Door open"))
 
 def close_door():
+    """Start closing and return at once; the returned future resolves when the door stops"""
     print("Closing door...")
     lcd_message("Closing door...")
-    servo.value = -0.11
-    sleep(2.6)
-    servo.value = 0
-    sleep(0.3)
-    servo.detach()
+    return motion.move(DOOR_CLOSE, on_done=report_move("Door close"))
 
 def get_current_time():
     return rtc.datetime
@@ -103,12 +126,16 @@ def time_until_event(now, target_hour):
 def show_boot_message():
     lcd_message("Booting up...")
     sleep(2)
-    lcd.clear()
+    lcd_writer.clear()
 
 def shutdown():
     print("Detaching servo and cleaning up...")
+    move = motion.stop()
+    if move is not None:
+        wait([move], timeout=2)  # let the ramp-down finish before touching the servo
     servo.detach()
-    lcd.clear()
+    lcd_writer.clear()
+    lcd_writer.flush()
 
 
 
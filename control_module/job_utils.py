@@ -0,0 +1,68 @@
+# control_module/job_utils.py
+import queue
+import threading
+
+
+class JobWorker:
+    """Run jobs one at a time on a dedicated thread so button callbacks return immediately.
+
+    A job is a callable job(cancel, progress). At most one job waits behind the
+    running one: extra presses coalesce into it. Submitting sets the running job's
+    cancel event so long jobs (the light show) can stop cleanly and make way.
+    Progress messages are forwarded to on_progress from their own thread so a slow
+    LCD never holds up the job.
+    """
+
+    def __init__(self, name="worker", on_progress=None):
+        self.name = name
+        self.on_progress = on_progress
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.pending = None
+        self.cancel = None
+        self.progress_queue = queue.Queue()
+        threading.Thread(target=self._run, daemon=True).start()
+        threading.Thread(target=self._report, daemon=True).start()
+
+    def submit(self, job, preempt=True):
+        """Queue a job, returns False if it was coalesced into one already waiting"""
+        with self.lock:
+            coalesced = self.pending is not None
+            self.pending = job
+            if preempt and self.cancel is not None:
+                self.cancel.set()
+        if coalesced:
+            print(f"🔁 {self.name}: request already queued, coalescing")
+        self.wakeup.set()
+        return not coalesced
+
+    def progress(self, *lines):
+        self.progress_queue.put(lines)
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            with self.lock:
+                job = self.pending
+                self.pending = None
+                self.cancel = threading.Event()
+                cancel = self.cancel
+                self.wakeup.clear()
+            if job is None:
+                continue
+            try:
+                job(cancel, self.progress)
+            except Exception as e:
+                print(f"❌ {self.name} job failed: {e}")
+            finally:
+                with self.lock:
+                    self.cancel = None
+
+    def _report(self):
+        while True:
+            lines = self.progress_queue.get()
+            # Only the newest message matters if several piled up
+            while not self.progress_queue.empty():
+                lines = self.progress_queue.get()
+            if self.on_progress is not None:
+                self.on_progress(*lines)
@@ -0,0 +1,74 @@
+# control_module/lcd_utils.py
+import threading
+
+
+class LcdWriter:
+    """Own the character LCD from one writer thread and only send the characters that changed.
+
+    show() never touches I2C: it replaces the pending text (newer text wins over
+    text not yet written) and wakes the writer. The writer diffs the target against
+    a shadow copy of what is on the glass and rewrites just the changed runs, so an
+    unchanged message costs nothing and a countdown tick is a couple of characters.
+    """
+
+    def __init__(self, lcd, rows=2, cols=16):
+        self.lcd = lcd
+        self.rows = rows
+        self.cols = cols
+        self.shadow = None  # unknown until the first clear
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.idle = threading.Event()
+        self.pending = None
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def show(self, *lines):
+        """Queue lines for display (missing lines are blank, long ones are cut); returns immediately"""
+        lines = list(lines[:self.rows]) + [""] * (self.rows - len(lines))
+        with self.lock:
+            self.pending = [line[:self.cols].ljust(self.cols) for line in lines]
+            self.idle.clear()
+        self.wakeup.set()
+
+    def clear(self):
+        self.show()
+
+    def flush(self, timeout=2.0):
+        """Wait until everything queued so far is on the display"""
+        return self.idle.wait(timeout)
+
+    def _run(self):
+        while True:
+            self.wakeup.wait()
+            with self.lock:
+                target = self.pending
+                self.pending = None
+                self.wakeup.clear()
+            if target is not None:
+                try:
+                    self._write(target)
+                except Exception as e:  # any driver error, the writer thread must survive it
+                    print(f"⚠️ LCD write failed: {e}")
+                    self.shadow = None  # contents unknown, start over with a clear next time
+            with self.lock:
+                if self.pending is None:
+                    self.idle.set()
+
+    def _write(self, target):
+        if self.shadow is None:
+            self.lcd.clear()
+            self.shadow = [" " * self.cols for _ in range(self.rows)]
+        for row, (old, new) in enumerate(zip(self.shadow, target)):
+            col = 0
+            while col < self.cols:
+                if old[col] == new[col]:
+                    col += 1
+                    continue
+                # Extend over the run of changed characters and send it in one go
+                end = col
+                while end < self.cols and old[end] != new[end]:
+                    end += 1
+                self.lcd.cursor_pos = (row, col)
+                self.lcd.write_string(new[col:end])
+                col = end
+            self.shadow[row] = new
@@ -0,0 +1,117 @@
+# control_module/motion_utils.py
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class MotionProfile:
+    """Run the servo at `speed` long enough to cover `travel_time` seconds of full-speed motion.
+
+    Speed ramps up and down with a smoothstep over `ramp` seconds at each end; the cruise
+    is stretched by the same amount so the door still travels as far as a hard start/stop.
+    """
+
+    def __init__(self, speed, travel_time, ramp=0.4, settle=0.3, step=0.02):
+        self.speed = speed
+        self.ramp = ramp
+        self.total = travel_time + ramp
+        self.settle = settle
+        self.step = step
+
+    def value_at(self, t):
+        edge = min(t, self.total - t, self.ramp)
+        if edge <= 0:
+            return 0.0
+        x = edge / self.ramp if self.ramp > 0 else 1.0
+        return self.speed * x * x * (3 - 2 * x)
+
+
+class MotionController:
+    """Run servo moves one at a time on a background thread.
+
+    move() returns a Future straight away: it resolves to True when the move
+    finished and False when a newer move cut it short (the servo ramps down
+    first rather than snapping to a stop). Takes any gpiozero Servo, so it can be
+    driven against gpiozero's MockFactory with MockPWMPin in tests.
+    """
+
+    def __init__(self, servo):
+        self.servo = servo
+        self.moves = queue.Queue()
+        self.lock = threading.Lock()
+        self.cancel = None
+        self.future = None  # latest move, queued or running
+        threading.Thread(target=self._run, daemon=True).start()
+
+    @property
+    def busy(self):
+        """True while a move is queued or running"""
+        future = self.future
+        return future is not None and not future.done()
+
+    def move(self, profile, on_done=None):
+        """Queue a move, cancelling whatever is running or waiting; on_done(completed) is called when it ends"""
+        future = Future()
+        if on_done is not None:
+            future.add_done_callback(lambda f: on_done(not f.cancelled() and f.exception() is None and f.result()))
+        cancel = threading.Event()
+        with self.lock:
+            if self.cancel is not None:
+                self.cancel.set()
+            self.cancel = cancel
+            self.future = future
+        self.moves.put((profile, future, cancel))
+        return future
+
+    def stop(self):
+        """Ramp down and stop the current move, if any; returns its future (done once the servo is released)"""
+        with self.lock:
+            if self.cancel is not None:
+                self.cancel.set()
+            return self.future
+
+    def _run(self):
+        while True:
+            profile, future, cancel = self.moves.get()
+            if cancel.is_set():  # superseded before it started
+                future.cancel()
+                continue
+            if not future.set_running_or_notify_cancel():
+                continue
+            error = None
+            try:
+                completed = self._drive(profile, cancel)
+            except Exception as e:
+                print(f"❌ Servo move failed: {e}")
+                error = e
+            finally:
+                self.servo.value = 0
+                self.servo.detach()
+            # Resolve only after the servo is released, so waiters never race the cleanup
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(completed)
+
+    def _drive(self, profile, cancel):
+        start = time.monotonic()
+        while True:
+            t = time.monotonic() - start
+            if cancel.is_set():
+                self._ramp_down(profile)
+                return False
+            if t >= profile.total:
+                break
+            self.servo.value = profile.value_at(t)
+            cancel.wait(profile.step)
+        self.servo.value = 0
+        cancel.wait(profile.settle)  # let the horn settle before cutting the pulses
+        return True
+
+    def _ramp_down(self, profile):
+        value = self.servo.value or 0.0
+        steps = max(1, int(profile.ramp / 2 / profile.step))
+        for i in range(steps, 0, -1):
+            self.servo.value = value * (i - 1) / steps
+            time.sleep(profile.step)
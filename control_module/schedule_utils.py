@@ -0,0 +1,252 @@
+# control_module/schedule_utils.py
+import heapq
+import itertools
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+
+SCHEDULE_PATH = "schedule.json"
+SCHEDULE_STATE_PATH = "schedule_state.json"  # last event fired per group, survives reboots
+
+# Used when there is no schedule.json; "days" (0=Mon..6=Sun) is optional and defaults to every day
+DEFAULT_SCHEDULE = [
+    {"action": "open_door", "at": "18:00"},
+    {"action": "close_door", "at": "06:00"},
+]
+
+
+def schedule_entry_error(entry, actions=None):
+    """Why a schedule entry is unusable, or None if it is fine"""
+    if not isinstance(entry, dict):
+        return "not an object"
+    if actions is not None and entry.get("action") not in actions:
+        return f"unknown action {entry.get('action')!r}, expected one of {sorted(actions)}"
+    try:
+        hour, minute = (int(part) for part in str(entry.get("at")).split(":"))
+    except ValueError:
+        return f"'at' must be HH:MM, got {entry.get('at')!r}"
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return f"'at' out of range: {entry.get('at')!r}"
+    days = entry.get("days")
+    if days is not None and (not isinstance(days, list) or not days
+                             or any(not isinstance(d, int) or not 0 <= d <= 6 for d in days)):
+        return f"'days' must be a non-empty list of weekdays 0 (Mon) to 6 (Sun), got {days!r}"
+    return None
+
+
+def load_schedule(path=SCHEDULE_PATH, actions=None):
+    """Valid entries from schedule.json (bad ones are reported and skipped), or DEFAULT_SCHEDULE if there are none"""
+    if not os.path.exists(path):
+        return DEFAULT_SCHEDULE
+    try:
+        with open(path) as f:
+            entries = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read {path} ({e}), using the default schedule")
+        return DEFAULT_SCHEDULE
+    if not isinstance(entries, list):
+        print(f"⚠️ {path} must hold a list of entries, using the default schedule")
+        return DEFAULT_SCHEDULE
+
+    valid = []
+    for entry in entries:
+        error = schedule_entry_error(entry, actions)
+        if error:
+            print(f"❌ Ignoring schedule entry {entry!r}: {error}")
+        else:
+            valid.append(entry)
+    if not valid:
+        print(f"⚠️ No usable entries in {path}, using the default schedule")
+        return DEFAULT_SCHEDULE
+    return valid
+
+
+class RtcClock:
+    """Wall time from the RTC, read over I2C once per resync_every seconds and extrapolated with the monotonic clock"""
+
+    def __init__(self, read_rtc, resync_every=3600):
+        self.read_rtc = read_rtc
+        self.resync_every = resync_every
+        self.base = None
+        self.base_mono = 0.0
+
+    def now(self):
+        mono = time.monotonic()
+        if self.base is None or mono - self.base_mono > self.resync_every:
+            t = self.read_rtc()
+            self.base = datetime(t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec)
+            self.base_mono = mono = time.monotonic()
+        return self.base + timedelta(seconds=mono - self.base_mono)
+
+
+class DailyEvent:
+    """Run action at a wall-clock time every day (or only on some weekdays)"""
+
+    def __init__(self, name, at, action, days=None, group=None, catch_up=True, grace=timedelta(hours=12)):
+        hour, minute = (int(part) for part in at.split(":"))
+        if days is not None and not days:
+            raise ValueError(f"{name}: days must not be empty")
+        self.name = name
+        self.time = (hour, minute)
+        self.action = action
+        self.days = set(days) if days is not None else None
+        # Within a group only the most recent missed event is caught up (e.g. open vs close)
+        self.group = group or name
+        self.catch_up = catch_up
+        self.grace = grace
+        self.persist = True  # remembered across reboots so catch-up never repeats it
+
+    def _on(self, day):
+        return day.replace(hour=self.time[0], minute=self.time[1], second=0, microsecond=0)
+
+    def next_after(self, dt):
+        due = self._on(dt)
+        while due <= dt or (self.days is not None and due.weekday() not in self.days):
+            due += timedelta(days=1)
+        return due
+
+    def last_before(self, dt):
+        due = self._on(dt)
+        while due > dt or (self.days is not None and due.weekday() not in self.days):
+            due -= timedelta(days=1)
+        return due
+
+
+class MinuteTick:
+    """Run action at the start of every minute (e.g. a countdown on the LCD)"""
+
+    def __init__(self, name, action):
+        self.name = name
+        self.action = action
+        self.group = name
+        self.catch_up = True
+        self.grace = timedelta(seconds=59)
+        self.persist = False
+
+    def next_after(self, dt):
+        return dt.replace(second=0, microsecond=0) + timedelta(minutes=1)
+
+    def last_before(self, dt):
+        return dt.replace(second=0, microsecond=0)
+
+
+class EventScheduler:
+    """Sleep until the next deadline in a priority queue of timed events instead of polling.
+
+    Events are fired in due order on the scheduler thread. One that fires late (a slow
+    action, or a woken-up board) still runs as long as it is within its grace period,
+    otherwise it is skipped and logged. The last event fired in each group is saved to
+    state_path; on start, a group's most recent due event is caught up only if it has not
+    run and the group is not already in that state (e.g. the door is not opened twice).
+    Groups with no saved state are not caught up, since the hardware state is unknown.
+    """
+
+    def __init__(self, clock, max_sleep=600, state_path=SCHEDULE_STATE_PATH):
+        self.clock = clock
+        self.state_path = state_path
+        self.state = self._load_state()
+        self.max_sleep = max_sleep  # re-check the clock at least this often in case the RTC moved
+        self.queue = []
+        self.events = []
+        self.counter = itertools.count()
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+
+    def add(self, event):
+        with self.lock:
+            self.events.append(event)
+            if self.thread.is_alive():
+                heapq.heappush(self.queue, (event.next_after(self.clock.now()), next(self.counter), event))
+        self.wakeup.set()
+        return event
+
+    def next_event(self, group):
+        """(due, event) of the next event in a group, or None"""
+        with self.lock:
+            upcoming = [(due, event) for due, _, event in self.queue if event.group == group]
+        return min(upcoming, key=lambda item: item[0], default=None)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.wakeup.set()
+
+    def _load_state(self):
+        try:
+            with open(self.state_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _record(self, event, due):
+        self.state[event.group] = {"name": event.name, "due": due.isoformat()}
+        tmp = self.state_path + ".tmp"
+        try:
+            with open(tmp, "w") as f:
+                json.dump(self.state, f)
+            os.replace(tmp, self.state_path)  # never leave a half-written file behind
+        except OSError as e:
+            print(f"⚠️ Could not save schedule state: {e}")
+
+    def _fire(self, event, due):
+        try:
+            event.action()
+        except Exception as e:
+            print(f"❌ Scheduled {event.name} at {due:%H:%M} failed: {e}")
+        if event.persist:
+            self._record(event, due)
+
+    def _already_done(self, event, due):
+        last = self.state.get(event.group)
+        if last is None:
+            print(f"⏰ No record of {event.group} events yet, not catching up {event.name}")
+            return True
+        return last["name"] == event.name or datetime.fromisoformat(last["due"]) >= due
+
+    def _catch_up(self, now):
+        latest = {}
+        for event in self.events:
+            if not event.catch_up:
+                continue
+            due = event.last_before(now)
+            if now - due <= event.grace and (event.group not in latest or due > latest[event.group][0]):
+                latest[event.group] = (due, event)
+        for due, event in sorted(latest.values(), key=lambda item: item[0]):
+            if event.persist and self._already_done(event, due):
+                continue
+            print(f"⏰ Catching up {event.name} due at {due:%H:%M}")
+            self._fire(event, due)
+
+    def _run(self):
+        now = self.clock.now()
+        with self.lock:
+            for event in self.events:
+                heapq.heappush(self.queue, (event.next_after(now), next(self.counter), event))
+        self._catch_up(now)
+
+        while not self.stop_event.is_set():
+            now = self.clock.now()
+            with self.lock:
+                if self.queue and self.queue[0][0] <= now:
+                    due, _, event = heapq.heappop(self.queue)
+                    heapq.heappush(self.queue, (event.next_after(max(due, now)), next(self.counter), event))
+                else:
+                    due, event = (self.queue[0][0], None) if self.queue else (None, None)
+
+            if event is None:
+                delay = (due - now).total_seconds() if due is not None else self.max_sleep
+                self.wakeup.wait(min(delay, self.max_sleep))
+                self.wakeup.clear()
+                continue
+
+            if now - due > event.grace:
+                print(f"⚠️ Skipped {event.name} due at {due:%H:%M}, {now - due} late")
+                continue
+            self._fire(event, due)
@@ -1,24 +1,23 @@
 # main.py
 from gpiozero import Button
 from gpiozero.pins.pigpio import PiGPIOFactory
-import threading
-from control_module.control import open_door, close_door, get_current_time, show_boot_message, time_until_event, lcd_message, setup_test_button, shutdown
+from control_module.control import open_door, close_door, get_current_time, show_boot_message, lcd_message, setup_test_button, shutdown
 # from vision_module.vision import capture_image
 from vision_module.yolo_utils import run_yolo
-from vision_module.capture_utils import capture_image
+from vision_module.capture_utils import start_camera_in_background
+from vision_module.burst_utils import capture_clean_image
 from vision_module.ui_utils import launch_editor
 from vision_module.edit_utils import edit_mask_interactively
+from vision_module.model_utils import warm_up_in_background
 from projection import play_animated_projection
+from control_module.job_utils import JobWorker
+from control_module.schedule_utils import load_schedule, RtcClock, DailyEvent, MinuteTick, EventScheduler
 
 
 
 
 import time
 
-# State flags for door
-opened = False
-closed = False
-
 # Set up PiGPIO
 factory = PiGPIOFactory()
 
@@ -28,52 +27,61 @@ photo_button = Button(21, pull_up=True, pin_factory=factory, bounce_time=0.2)
 test_button = Button(22, pull_up=True, pin_factory=factory, bounce_time=0.2)
 
 
-def handle_photo_press():
-    print("Button pressed to capture image")
-    lcd_message("Taking picture", "Please wait...")
-    image = capture_image()
-    lcd_message("Done!", "Image captured")
+def capture_and_show(cancel, progress):
+    progress("Taking picture", "Please wait...")
+    image = capture_clean_image()  # burst + median merge, much less noise at dusk
+    progress("Done!", "Image captured")
 
     launch_editor(image, initial_conf=0.6)  # User edits as needed
+    if cancel.is_set():  # Another press came in while editing, start over with a fresh photo
+        return
 
     # After editing, immediately continue to lights
-    lcd_message("Displaying lights", "Enjoy the show!")
+    progress("Displaying lights", "Enjoy the show!")
     print("Starting animated projection")
-    play_animated_projection("mask_dynamic.png", "gifs/colors.gif")
+    play_animated_projection("mask_dynamic.png", "gifs/colors.gif", stop_event=cancel)
+
+
+# Capture, editing and the show run on their own thread; a new press stops the current show
+show_worker = JobWorker("show", on_progress=lcd_message)
+
+
+def handle_photo_press():
+    print("Button pressed to capture image")
+    show_worker.submit(capture_and_show)
 
 
 photo_button.when_pressed = handle_photo_press
 
-def rtc_loop():
-    global opened, closed
-    while True:
-        now = get_current_time()
-        hour = now.tm_hour
-        minute = now.tm_min
-
-        if hour == 18 and minute == 0 and not opened:
-            open_door()
-            opened = True
-            closed = False
-        elif hour == 6 and minute == 0 and not closed:
-            close_door()
-            closed = True
-            opened = False
-
-        # Display countdown on LCD
-        if 6 <= hour < 18:
-            hrs, mins = time_until_event(now, 18)
-            lcd_message("Open in:", f"{hrs:02}h {mins:02}m remains")
-        else:
-            hrs, mins = time_until_event(now, 6)
-            lcd_message("Magic sleeps in:", f"{hrs:02}h {mins:02}m")
-
-        time.sleep(20)
+# Door schedule: sleeps until the next deadline, the RTC is only read to resync the clock
+SCHEDULED_ACTIONS = {"open_door": open_door, "close_door": close_door}
+scheduler = EventScheduler(RtcClock(get_current_time))
+for entry in load_schedule(actions=SCHEDULED_ACTIONS):
+    scheduler.add(DailyEvent(entry["action"], entry["at"], SCHEDULED_ACTIONS[entry["action"]], days=entry.get("days"), group="door"))
+
+
+def show_countdown():
+    upcoming = scheduler.next_event("door")
+    if upcoming is None:
+        return
+    due, event = upcoming
+    now = scheduler.clock.now().replace(second=0, microsecond=0)
+    hrs, mins = divmod(int((due - now).total_seconds()) // 60, 60)
+    if event.name == "open_door":
+        lcd_message("Open in:", f"{hrs:02}h {mins:02}m remains")
+    else:
+        lcd_message("Magic sleeps in:", f"{hrs:02}h {mins:02}m")
+
+
+# The countdown only changes once a minute, so that is how often the LCD is rewritten
+scheduler.add(MinuteTick("countdown", show_countdown))
 
 try:
     show_boot_message()
+    warm_up_in_background()  # YOLO loads while the RTC loop starts, not on the first photo
+    start_camera_in_background()
     setup_test_button()  # ✅ This sets up the demo test button on GPIO 22
-    threading.Thread(target=rtc_loop, daemon=True).start()
+    scheduler.start()
 
     # Keep main thread alive
     while True:
@@ -1,37 +1,155 @@
+import time
 import cv2
 import numpy as np
-from PIL import Image, ImageSequence
+from projection_module.gif_utils import GifFrameStream
+from projection_module.cache_utils import CACHE_DIR, cache_key, load_cached_store, build_cached_store
+from projection_module.store_utils import FrameStore
+from projection_module.display_utils import FrameDisplay
+from projection_module.layer_utils import CLASS_MASK_DIR, DEFAULT_LAYERS, load_class_masks, LayerCompositor
+from projection_module.effect_utils import DEFAULT_EFFECTS, build_effects, EffectEngine
+from projection_module.calibration_utils import load_projector_mask
 
 
-def play_animated_projection(mask_path="mask_dynamic.png", gif_path="gifs/colors.gif"):
-    mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+def feed_frame_store(store, display):
+    """Loop a memory-mapped store into the display without decoding anything"""
+    x, y, cw, ch = store.bbox
+    while display.running:
+        for f, duration in zip(store.frames, store.durations):
+            if store.full_frame:
+                # The mapped frame goes straight to imshow, no copy at all
+                if not display.submit_external(f, duration):
+                    return
+                continue
+            # Only the lit box is copied in; the rest of every buffer stays black from allocation
+            slot = display.acquire()
+            if slot is None:  # ESC pressed
+                return
+            display.buffers[slot][y:y + ch, x:x + cw] = f
+            display.submit(slot, duration)
+
+
+def play_animated_projection(mask_path="mask_dynamic.png", gif_path="gifs/colors.gif", precomposite=True,
+                             pinned=False, buffer_size=8, display_buffers=3, cache_dir=CACHE_DIR, stop_event=None):
+    # Runs until ESC, or until stop_event is set from another thread (e.g. a new capture)
+    # h, w = mask.shape[:2]
+    w, h = 1280, 768
+    # Rasterized straight at projector resolution from the editor's vector scene when there is one,
+    # and warped onto the house when a projector calibration has been saved
+    mask = load_projector_mask(mask_path, (w, h))
     if mask is None:
         print("❌ Error: Could not load mask.")
         return
-    # h, w = mask.shape[:2]
+
+    # Pinned masks every frame once into a memory-mapped store on disk (keyed by mask, gif and
+    # resolution) so later runs start instantly; otherwise frames stream through a small ring buffer
+    if pinned:
+        key = cache_key(mask, gif_path, (w, h))
+        store = load_cached_store(key, cache_dir) or build_cached_store(key, mask, gif_path, (w, h), cache_dir)
+        display = FrameDisplay("Projected Lights", (w, h), display_buffers, stop_event=stop_event).start()
+        try:
+            feed_frame_store(store, display)
+        finally:
+            display.stop()
+        return
+
+    stream = GifFrameStream(gif_path, (w, h), buffer_size, mask=mask if precomposite else None).start()
+
+    # This thread only composites into the display's preallocated buffers, the display thread paces and shows them
+    display = FrameDisplay("Projected Lights", (w, h), display_buffers, stop_event=stop_event).start()
+    try:
+        for f, duration in stream:
+            slot = display.acquire()
+            if slot is None:  # ESC pressed
+                break
+            if precomposite:
+                np.copyto(display.buffers[slot], f)
+            else:
+                # Pixels outside the mask are never written, so they stay black from allocation
+                cv2.bitwise_and(f, f, dst=display.buffers[slot], mask=mask)
+            display.submit(slot, duration)
+    finally:
+        stream.stop()
+        display.stop()
+
+
+def play_layered_projection(layers=DEFAULT_LAYERS, mask_dir=CLASS_MASK_DIR, fps=30, display_buffers=3, stop_event=None):
+    """Play a different animation on each class mask saved by the editor (e.g. snow on the roof, twinkle on the trim)"""
     w, h = 1280, 768
-    mask = cv2.resize(mask, (w, h))
-
-
-    gif = Image.open(gif_path)
-    frames = []
-    for frame in ImageSequence.Iterator(gif):
-        rgb = frame.convert("RGB").resize((w, h))
-        frame_cv = np.array(rgb)[..., ::-1]
-        frames.append(frame_cv)
-
-    cv2.namedWindow("Projected Lights", cv2.WND_PROP_FULLSCREEN)
-    cv2.moveWindow("Projected Lights", 0, 0)
-    cv2.setWindowProperty("Projected Lights", cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-
-    while True:
-        for f in frames:
-            overlay = cv2.bitwise_and(f, f, mask=mask)
-            cv2.imshow("Projected Lights", overlay)
-            if cv2.waitKey(100) & 0xFF == 27:  # ESC to quit
-                cv2.destroyAllWindows()
-                return
-        if cv2.waitKey(10) & 0xFF == 27:
-            break
+    masks = load_class_masks(layers.keys(), (w, h), mask_dir)
+    if not masks:
+        print("❌ Error: No class masks found.")
+        return
+
+    compositor = LayerCompositor(masks, layers, (w, h), frame_ms=1000 / fps).start()
+    display = FrameDisplay("Projected Lights", (w, h), display_buffers, stop_event=stop_event).start()
+    try:
+        while True:
+            slot = display.acquire()
+            if slot is None:  # ESC pressed
+                break
+            compositor.compose(display.buffers[slot])
+            display.submit(slot, compositor.frame_ms)
+    except StopIteration:
+        print("❌ A layer's animation stopped")
+    finally:
+        compositor.stop()
+        display.stop()
+
+
+def play_procedural_projection(effects=DEFAULT_EFFECTS, mask_dir=CLASS_MASK_DIR, fps=30, display_buffers=3, stop_event=None):
+    """Render chase, twinkle, snowfall and color-wave effects from the class masks, no GIFs needed"""
+    w, h = 1280, 768
+    masks = load_class_masks(effects.keys(), (w, h), mask_dir)
+    engine = EffectEngine(build_effects(masks, (w, h), effects))
+    if not engine.effects:
+        print("❌ Error: No class masks found.")
+        return
+
+    display = FrameDisplay("Projected Lights", (w, h), display_buffers, stop_event=stop_event).start()
+    start = time.monotonic()
+    try:
+        while True:
+            slot = display.acquire()
+            if slot is None:  # ESC pressed
+                break
+            engine.render(display.buffers[slot], time.monotonic() - start)
+            display.submit(slot, 1000 / fps)
+    finally:
+        engine.report()
+        display.stop()
+
+
+def play_rendered_show(path="masked_projection.frames", display_buffers=3, stop_event=None):
+    """Loop a show made by render_show.py; .frames stores are memory-mapped so nothing is decoded"""
+    if path.endswith(".frames"):
+        store = FrameStore(path)
+        display = FrameDisplay("Projected Lights", store.size, display_buffers, stop_event=stop_event).start()
+        try:
+            feed_frame_store(store, display)
+        finally:
+            display.stop()
+        return
+
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        print(f"❌ Error: Could not open {path}.")
+        return
+    w, h = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30
 
-    cv2.destroyAllWindows()
\ No newline at end of file
+    display = FrameDisplay("Projected Lights", (w, h), display_buffers, stop_event=stop_event).start()
+    try:
+        while display.running:
+            cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            while True:
+                ret, f = cap.read()
+                if not ret:  # end of the video, loop from the start
+                    break
+                slot = display.acquire()
+                if slot is None:  # ESC pressed
+                    break
+                np.copyto(display.buffers[slot], f)
+                display.submit(slot, 1000 / fps)
+    finally:
+        cap.release()
+        display.stop()
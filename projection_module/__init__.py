@@ -0,0 +1,2 @@
+# projection_module/__init__.py
+# Makes this folder a module
@@ -0,0 +1,56 @@
+# projection_module/cache_utils.py
+import os
+import hashlib
+import numpy as np
+from PIL import Image, ImageSequence
+from projection_module.gif_utils import frame_duration
+from projection_module.roi_utils import RoiCompositor
+from projection_module.store_utils import mask_bbox, FrameStoreWriter, FrameStore
+
+CACHE_DIR = "frame_cache"
+
+
+def file_hash(path):
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_key(mask, gif_path, size):
+    """Key a composited show by (mask hash, gif hash, output resolution)"""
+    h = hashlib.sha1()
+    h.update(np.ascontiguousarray(mask).tobytes())
+    h.update(file_hash(gif_path).encode())
+    h.update(f"{size[0]}x{size[1]}".encode())
+    return h.hexdigest()[:16]
+
+
+def load_cached_store(key, cache_dir=CACHE_DIR):
+    """Memory-map a cached show, or None on a miss"""
+    path = os.path.join(cache_dir, f"{key}.frames")
+    if not os.path.exists(path):
+        return None
+    try:
+        store = FrameStore(path)
+    except (OSError, ValueError):
+        print(f"⚠️ Ignoring unreadable frame cache {path}")
+        return None
+    print(f"⚡ Mapped {len(store)} precomposited frames from {path}")
+    return store
+
+
+def build_cached_store(key, mask, gif_path, size, cache_dir=CACHE_DIR):
+    """Mask every GIF frame once and stream the crops to disk, one frame in memory at a time"""
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"{key}.frames")
+    writer = FrameStoreWriter(path, size, mask_bbox(mask))
+    gif = Image.open(gif_path)
+    roi = RoiCompositor(mask, gif.size)
+    canvas = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    for frame in ImageSequence.Iterator(gif):
+        writer.write(roi.composite(np.asarray(frame.convert("RGB")), canvas, rgb=True), frame_duration(frame))
+    writer.close()
+    print(f"💾 Cached {len(writer.durations)} precomposited frames to {path}")
+    return FrameStore(path)
@@ -0,0 +1,168 @@
+# projection_module/calibration_utils.py
+import argparse
+import os
+import cv2
+import numpy as np
+from vision_module.capture_utils import get_camera
+from vision_module.scene_utils import fresh_scene, load_mask
+
+CALIBRATION_PATH = "calibration.npz"
+PROJECTOR_SIZE = (1280, 768)
+
+
+def gray_code_patterns(size):
+    """(axis, bit, pattern, inverse) for every Gray-code bit of the projector's columns then rows, MSB first"""
+    w, h = size
+    patterns = []
+    for axis, length in ((0, w), (1, h)):
+        coords = np.arange(length)
+        gray = coords ^ (coords >> 1)
+        for bit in reversed(range(int(np.ceil(np.log2(length))))):
+            line = ((gray >> bit) & 1).astype(np.uint8) * 255
+            pattern = np.tile(line, (h, 1)) if axis == 0 else np.tile(line[:, None], (1, w))
+            patterns.append((axis, bit, pattern, 255 - pattern))
+    return patterns
+
+
+def decode_gray_code(captures, black, white, min_contrast=20):
+    """Per camera pixel projector (x, y) from the captured pattern/inverse pairs, plus where it is trustworthy"""
+    valid = white.astype(np.int16) - black.astype(np.int16) > min_contrast
+    gray = [np.zeros(black.shape, dtype=np.int32), np.zeros(black.shape, dtype=np.int32)]
+    for axis, bit, seen, seen_inverse in captures:
+        gray[axis] |= (seen > seen_inverse).astype(np.int32) << bit
+        # Pixels where a pattern and its inverse look alike are lit by neither reliably
+        valid &= np.abs(seen.astype(np.int16) - seen_inverse.astype(np.int16)) > min_contrast // 2
+    coords = []
+    for g in gray:
+        # Gray -> binary by folding in every right shift
+        b, shift = g.copy(), g >> 1
+        while shift.any():
+            b ^= shift
+            shift >>= 1
+        coords.append(b)
+    return coords[0], coords[1], valid
+
+
+def fit_homography(proj_x, proj_y, valid, projector_size, stride=4, threshold=0.004):
+    """Normalized camera -> projector homography from decoded correspondences (RANSAC)"""
+    cam_h, cam_w = valid.shape
+    pw, ph = projector_size
+    valid = valid & (proj_x < pw) & (proj_y < ph)
+    ys, xs = np.nonzero(valid)
+    ys, xs = ys[::stride], xs[::stride]
+    if len(xs) < 100:
+        return None, 0.0
+    src = np.stack([(xs + 0.5) / cam_w, (ys + 0.5) / cam_h], axis=1)
+    dst = np.stack([(proj_x[ys, xs] + 0.5) / pw, (proj_y[ys, xs] + 0.5) / ph], axis=1)
+    homography, inliers = cv2.findHomography(src, dst, cv2.RANSAC, threshold)
+    if homography is None:
+        return None, 0.0
+    return homography, float(inliers.mean())
+
+
+def calibrate(size=PROJECTOR_SIZE, camera=None, settle_ms=300, path=CALIBRATION_PATH, window_name="Projected Lights"):
+    """Project Gray-code stripes, decode them from the camera and save the camera -> projector homography"""
+    camera = camera or get_camera()
+    cv2.namedWindow(window_name, cv2.WND_PROP_FULLSCREEN)
+    cv2.moveWindow(window_name, 0, 0)
+    cv2.setWindowProperty(window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    def shoot(pattern):
+        cv2.imshow(window_name, pattern)
+        cv2.waitKey(settle_ms)
+        # The first frame after a pattern change can still show the previous one
+        return cv2.cvtColor(camera.capture_burst(2)[-1], cv2.COLOR_BGR2GRAY)
+
+    w, h = size
+    try:
+        black = shoot(np.zeros((h, w), dtype=np.uint8))
+        white = shoot(np.full((h, w), 255, dtype=np.uint8))
+        patterns = gray_code_patterns(size)
+        captures = []
+        for i, (axis, bit, pattern, inverse) in enumerate(patterns):
+            print(f"🔲 Calibration pattern {i + 1}/{len(patterns)}")
+            captures.append((axis, bit, shoot(pattern), shoot(inverse)))
+    finally:
+        cv2.destroyWindow(window_name)
+
+    proj_x, proj_y, valid = decode_gray_code(captures, black, white)
+    homography, inlier_ratio = fit_homography(proj_x, proj_y, valid, size)
+    if homography is None:
+        print("❌ Calibration failed: the camera could not see enough of the projection")
+        return None
+    np.savez(path, homography=homography, projector_size=np.array(size))
+    print(f"✅ Calibration saved to {path} ({valid.mean():.0%} of the view lit, {inlier_ratio:.0%} inliers)")
+    return Calibration(homography)
+
+
+class Calibration:
+    """Camera -> projector homography in normalized coordinates, with remap tables baked per size"""
+
+    def __init__(self, homography):
+        self.homography = homography
+        self.maps = {}
+
+    def pixel_homography(self, src_size, dst_size):
+        to_norm = np.diag([1 / src_size[0], 1 / src_size[1], 1.0])
+        to_pixels = np.diag([dst_size[0], dst_size[1], 1.0])
+        return to_pixels @ self.homography @ to_norm
+
+    def remap_tables(self, src_size, dst_size):
+        """Fixed-point maps from every projector pixel back to the camera image, built once per size pair"""
+        key = (tuple(src_size), tuple(dst_size))
+        if key not in self.maps:
+            w, h = dst_size
+            inverse = np.linalg.inv(self.pixel_homography(src_size, dst_size))
+            xs, ys = np.meshgrid(np.arange(w, dtype=np.float64), np.arange(h, dtype=np.float64))
+            pts = inverse @ np.stack([xs.ravel(), ys.ravel(), np.ones(w * h)])
+            map_x = (pts[0] / pts[2]).reshape(h, w).astype(np.float32)
+            map_y = (pts[1] / pts[2]).reshape(h, w).astype(np.float32)
+            self.maps[key] = cv2.convertMaps(map_x, map_y, cv2.CV_16SC2)
+        return self.maps[key]
+
+    def warp(self, image, size):
+        """Camera-space image to projector space at size=(w, h) in one remap pass"""
+        map1, map2 = self.remap_tables(image.shape[1::-1], size)
+        return cv2.remap(image, map1, map2, cv2.INTER_LINEAR, borderMode=cv2.BORDER_CONSTANT, borderValue=0)
+
+
+# Loaded calibration keyed by path and mtime, so its baked tables are reused across shows
+_calibration = {}
+
+
+def load_calibration(path=CALIBRATION_PATH):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _calibration.get(path)
+    if cached is None or cached[0] != mtime:
+        with np.load(path) as data:
+            cached = (mtime, Calibration(data["homography"]))
+        _calibration[path] = cached
+    return cached[1]
+
+
+def load_projector_mask(mask_path, size, classes=None, calibration_path=CALIBRATION_PATH):
+    """Editor mask in projector space: vector scenes are warped point-wise, PNGs through the remap tables"""
+    calibration = load_calibration(calibration_path)
+    if calibration is None:
+        return load_mask(mask_path, size, classes=classes)
+    scene = fresh_scene(mask_path)
+    if scene is not None:
+        return scene.rasterize(size, classes=classes, warp=calibration.homography)
+    mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+    if mask is None:
+        return None
+    return calibration.warp(mask, size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate the projector against the camera with Gray-code stripes")
+    parser.add_argument("--width", type=int, default=PROJECTOR_SIZE[0])
+    parser.add_argument("--height", type=int, default=PROJECTOR_SIZE[1])
+    parser.add_argument("--settle-ms", type=int, default=300, help="wait after each pattern before capturing")
+    parser.add_argument("--output", default=CALIBRATION_PATH)
+    args = parser.parse_args()
+
+    calibrate((args.width, args.height), settle_ms=args.settle_ms, path=args.output)
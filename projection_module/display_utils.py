@@ -0,0 +1,104 @@
+# projection_module/display_utils.py
+import queue
+import threading
+import cv2
+import numpy as np
+from projection_module.schedule_utils import FrameScheduler
+
+
+class FrameDisplay:
+    """Own the projector window on a dedicated thread.
+
+    Producers acquire() one of a few preallocated buffers, fill it in place and
+    submit() it with its duration. The display thread paces and shows it, then
+    hands the buffer back, so nothing is allocated per frame. Frames that already
+    live somewhere stable (e.g. a memory-mapped store) can be passed straight
+    through with submit_external(). All HighGUI calls happen on the display thread.
+    """
+
+    def __init__(self, window_name, size, num_buffers=3, scheduler=None, stop_event=None):
+        w, h = size
+        self.window_name = window_name
+        self.buffers = np.zeros((num_buffers, h, w, 3), dtype=np.uint8)
+        self.free_slots = queue.Queue()
+        self.ready_slots = queue.Queue(maxsize=num_buffers)
+        for slot in range(num_buffers):
+            self.free_slots.put(slot)
+        self.scheduler = scheduler or FrameScheduler()
+        # Passing in a shared event lets another thread end the show (e.g. a new capture)
+        self.stop_event = stop_event or threading.Event()
+        self.thread = threading.Thread(target=self._display_loop, daemon=True)
+
+    @property
+    def running(self):
+        return not self.stop_event.is_set()
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
+
+    def acquire(self):
+        """Block until a buffer is free, returns its slot or None once the display has stopped"""
+        while self.running:
+            try:
+                return self.free_slots.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return None
+
+    def _put(self, item):
+        while self.running:
+            try:
+                self.ready_slots.put(item, timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def submit(self, slot, duration_ms):
+        return self._put((self.buffers[slot], duration_ms, slot))
+
+    def submit_external(self, frame, duration_ms):
+        """Show a full-size frame without copying it; blocks while the display is behind, False once stopped"""
+        return self._put((frame, duration_ms, None))
+
+    def _release(self, slot):
+        if slot is not None:
+            self.free_slots.put(slot)
+
+    def _open_window(self):
+        cv2.namedWindow(self.window_name, cv2.WND_PROP_FULLSCREEN)
+        cv2.moveWindow(self.window_name, 0, 0)
+        cv2.setWindowProperty(self.window_name, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+
+    def _display_loop(self):
+        self._open_window()
+        try:
+            while self.running:
+                try:
+                    frame, duration, slot = self.ready_slots.get(timeout=0.05)
+                except queue.Empty:
+                    # Producer is behind, keep the window responsive while the last frame stays up
+                    if cv2.waitKey(1) & 0xFF == 27:
+                        break
+                    continue
+
+                if self.scheduler.should_drop(duration, newer_waiting=not self.ready_slots.empty()):
+                    self._release(slot)
+                    continue
+                self.scheduler.wait()
+                cv2.imshow(self.window_name, frame)
+                self.scheduler.presented(duration)
+                key = cv2.waitKey(1) & 0xFF
+                self._release(slot)
+                if key == 27:  # ESC to quit
+                    break
+        finally:
+            self.stop_event.set()
+            self.scheduler.report()
+            cv2.destroyWindow(self.window_name)
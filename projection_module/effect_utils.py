@@ -0,0 +1,170 @@
+# projection_module/effect_utils.py
+import time
+import cv2
+import numpy as np
+
+# BGR palettes
+CHASE_COLORS = np.array([(0, 0, 255), (0, 255, 0), (255, 255, 255)], dtype=np.float32)
+TWINKLE_COLORS = np.array([(80, 200, 255), (255, 255, 255), (0, 0, 255), (0, 255, 0)], dtype=np.float32)
+
+# Which effect runs on each detected class
+DEFAULT_EFFECTS = {
+    "trim": "chase",
+    "window": "twinkle",
+    "roof": "snowfall",
+    "door": "wave",
+}
+
+
+def sample_along(points, spacing, closed=True):
+    """Evenly spaced (x, y) positions every `spacing` px along a polyline"""
+    pts = np.asarray(points, dtype=np.float32).reshape(-1, 2)
+    if closed:
+        pts = np.vstack([pts, pts[:1]])
+    seg = np.diff(pts, axis=0)
+    dist = np.concatenate([[0], np.cumsum(np.hypot(seg[:, 0], seg[:, 1]))])
+    if dist[-1] < spacing:
+        return pts[:1]
+    d = np.arange(0, dist[-1], spacing)
+    return np.stack([np.interp(d, dist, pts[:, 0]), np.interp(d, dist, pts[:, 1])], axis=1)
+
+
+def stamp_indices(centers, radius, size):
+    """Flat pixel indices of a small disc around each center, shape (n, k)"""
+    w, h = size
+    oy, ox = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    keep = ox ** 2 + oy ** 2 <= radius ** 2
+    ox, oy = ox[keep], oy[keep]
+    cx = np.rint(centers[:, 0]).astype(np.int64)[:, None]
+    cy = np.rint(centers[:, 1]).astype(np.int64)[:, None]
+    return np.clip(cy + oy, 0, h - 1) * w + np.clip(cx + ox, 0, w - 1)
+
+
+def hue_lut():
+    """BGR color for each OpenCV hue 0..179 at full saturation/value"""
+    hsv = np.stack([np.arange(180, dtype=np.uint8), np.full(180, 255, np.uint8), np.full(180, 255, np.uint8)], axis=1)
+    return cv2.cvtColor(hsv[None], cv2.COLOR_HSV2BGR)[0]
+
+
+class ChaseLights:
+    """Bulbs along polylines with a lit pattern marching along them"""
+
+    def __init__(self, polylines, size, spacing=14, radius=3, speed=6.0, period=3):
+        centers = np.vstack([sample_along(p, spacing) for p in polylines])
+        self.idx = stamp_indices(centers, radius, size)
+        n = len(centers)
+        self.order = np.arange(n)
+        self.colors = CHASE_COLORS[self.order % len(CHASE_COLORS)]
+        self.speed = speed
+        self.period = period
+
+    def draw(self, out_flat, t):
+        step = int(t * self.speed)
+        level = np.where((self.order + step) % self.period == 0, 1.0, 0.2).astype(np.float32)
+        out_flat[self.idx] = (self.colors * level[:, None]).astype(np.uint8)[:, None, :]
+
+
+class Twinkle:
+    """Bulbs along polylines, each fading in and out at its own random rate"""
+
+    def __init__(self, polylines, size, spacing=18, radius=2, seed=0):
+        rng = np.random.default_rng(seed)
+        centers = np.vstack([sample_along(p, spacing) for p in polylines])
+        n = len(centers)
+        self.idx = stamp_indices(centers, radius, size)
+        self.colors = TWINKLE_COLORS[rng.integers(0, len(TWINKLE_COLORS), n)]
+        self.freq = rng.uniform(0.3, 1.5, n).astype(np.float32)
+        self.phase = rng.uniform(0, 2 * np.pi, n).astype(np.float32)
+
+    def draw(self, out_flat, t):
+        level = (0.5 + 0.5 * np.sin(2 * np.pi * self.freq * t + self.phase)) ** 3
+        out_flat[self.idx] = (self.colors * level[:, None]).astype(np.uint8)[:, None, :]
+
+
+class Snowfall:
+    """Flakes drifting down inside a filled region; positions are a pure function of t"""
+
+    def __init__(self, region, size, count=400, radius=1, seed=0):
+        rng = np.random.default_rng(seed)
+        ys, xs = np.nonzero(region)
+        self.region = region.reshape(-1) > 0
+        self.size = size
+        self.radius = radius
+        self.x0, self.x1 = xs.min(), xs.max() + 1
+        self.y0, self.span = ys.min(), ys.max() + 1 - ys.min()
+        self.x = rng.uniform(self.x0, self.x1, count).astype(np.float32)
+        self.y = rng.uniform(0, self.span, count).astype(np.float32)
+        self.vy = rng.uniform(20, 60, count).astype(np.float32)
+        self.sway = rng.uniform(2, 8, count).astype(np.float32)
+        self.phase = rng.uniform(0, 2 * np.pi, count).astype(np.float32)
+
+    def draw(self, out_flat, t):
+        y = self.y0 + (self.y + self.vy * t) % self.span
+        x = self.x + self.sway * np.sin(0.8 * t + self.phase)
+        idx = stamp_indices(np.stack([x, y], axis=1), self.radius, self.size).reshape(-1)
+        out_flat[idx[self.region[idx]]] = 255
+
+
+class ColorWave:
+    """Rainbow sweeping diagonally across a mask's lit pixels"""
+
+    def __init__(self, mask, size, scale=0.15, speed=40.0):
+        w, _ = size
+        self.lit = np.flatnonzero(mask.reshape(-1) > 0)
+        self.offset = ((self.lit % w + self.lit // w) * scale).astype(np.float32)
+        self.lut = hue_lut()
+        self.speed = speed
+
+    def draw(self, out_flat, t):
+        hue = ((self.offset + t * self.speed) % 180).astype(np.intp)
+        out_flat[self.lit] = self.lut[hue]
+
+
+def build_effects(masks, size, effects=DEFAULT_EFFECTS):
+    """Turn the editor's class masks into effect instances"""
+    built = []
+    for cls, kind in effects.items():
+        mask = masks.get(cls)
+        if mask is None or not mask.any():
+            continue
+        cnts, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        polylines = [c.reshape(-1, 2) for c in cnts if len(c) > 1]
+        if kind == "chase" and polylines:
+            built.append(ChaseLights(polylines, size))
+        elif kind == "twinkle" and polylines:
+            built.append(Twinkle(polylines, size))
+        elif kind == "snowfall":
+            region = np.zeros(mask.shape, dtype=np.uint8)
+            cv2.fillPoly(region, cnts, 255)
+            built.append(Snowfall(region, size))
+        elif kind == "wave":
+            built.append(ColorWave(mask, size))
+        else:
+            print(f"⚠️ Unknown effect '{kind}' for '{cls}'")
+    return built
+
+
+class EffectEngine:
+    """Render all effects straight into a projector-resolution frame"""
+
+    def __init__(self, effects):
+        self.effects = effects
+        self.render_s = 0.0
+        self.rendered = 0
+
+    def render(self, out, t):
+        t0 = time.perf_counter()
+        out.fill(0)
+        out_flat = out.reshape(-1, 3)
+        for effect in self.effects:
+            effect.draw(out_flat, t)
+        self.render_s += time.perf_counter() - t0
+        self.rendered += 1
+        if self.rendered == 300:
+            self.report()
+
+    def report(self):
+        if self.rendered:
+            print(f"✨ {len(self.effects)} effects, {1000 * self.render_s / self.rendered:.2f} ms per frame")
+        self.render_s = 0.0
+        self.rendered = 0
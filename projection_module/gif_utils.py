@@ -0,0 +1,92 @@
+# projection_module/gif_utils.py
+import queue
+import threading
+import numpy as np
+from PIL import Image, ImageSequence
+from projection_module.roi_utils import RoiCompositor
+
+
+DEFAULT_DURATION_MS = 100
+
+
+def frame_duration(frame):
+    # Browsers treat missing or near-zero GIF delays as 100 ms, do the same
+    duration = frame.info.get("duration") or DEFAULT_DURATION_MS
+    return duration if duration > 10 else DEFAULT_DURATION_MS
+
+
+class GifFrameStream:
+    """Loop a GIF forever, decoding on a background thread into a fixed ring of frames.
+
+    Yields (frame, duration_ms). Memory is buffer_size frames no matter how long the
+    animation is. A yielded frame stays valid until the next one is requested, then
+    its slot is reused.
+    """
+
+    def __init__(self, gif_path, size, buffer_size=8, mask=None):
+        w, h = size
+        self.gif_path = gif_path
+        self.size = size
+        # Optional mask is applied on the decoder thread so the display loop only blits,
+        # and only the mask's lit tiles are ever resized or written
+        self.mask = mask
+        self.roi = None
+        self.ring = np.zeros((buffer_size, h, w, 3), dtype=np.uint8)
+        self.durations = [DEFAULT_DURATION_MS] * buffer_size
+        self.free_slots = queue.Queue()
+        self.ready_slots = queue.Queue()
+        for slot in range(buffer_size):
+            self.free_slots.put(slot)
+        self.stop_event = threading.Event()
+        self.error = None
+        self.thread = threading.Thread(target=self._decode_loop, daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join(timeout=1)
+
+    def _next_free_slot(self):
+        while not self.stop_event.is_set():
+            try:
+                return self.free_slots.get(timeout=0.2)
+            except queue.Empty:
+                continue
+        return None
+
+    def _decode_loop(self):
+        try:
+            gif = Image.open(self.gif_path)
+            if self.mask is not None:
+                self.roi = RoiCompositor(self.mask, gif.size)
+            while not self.stop_event.is_set():
+                for frame in ImageSequence.Iterator(gif):
+                    slot = self._next_free_slot()
+                    if slot is None:
+                        return
+                    if self.roi is None:
+                        np.copyto(self.ring[slot], np.asarray(frame.convert("RGB").resize(self.size))[..., ::-1])
+                    else:
+                        self.roi.composite(np.asarray(frame.convert("RGB")), self.ring[slot], rgb=True)
+                    self.durations[slot] = frame_duration(frame)
+                    self.ready_slots.put(slot)
+        except Exception as e:
+            print(f"❌ GIF decoder stopped: {e}")
+            self.error = e
+            self.stop_event.set()
+
+    def __iter__(self):
+        in_use = None
+        while not self.stop_event.is_set():
+            try:
+                slot = self.ready_slots.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            # The caller is done with the previous frame, hand its slot back to the decoder
+            if in_use is not None:
+                self.free_slots.put(in_use)
+            in_use = slot
+            yield self.ring[slot], self.durations[slot]
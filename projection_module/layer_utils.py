@@ -0,0 +1,125 @@
+# projection_module/layer_utils.py
+import os
+import time
+import numpy as np
+from projection_module.gif_utils import GifFrameStream
+from projection_module.calibration_utils import load_projector_mask
+
+CLASS_MASK_DIR = "class_masks"
+
+# Which animation plays on each detected class, earlier entries win where masks overlap
+DEFAULT_LAYERS = {
+    "trim": "gifs/red_green.gif",
+    "window": "gifs/snowflakes.gif",
+    "door": "gifs/kims.gif",
+    "roof": "gifs/snowing.gif",
+}
+
+
+def load_class_masks(classes, size, mask_dir=CLASS_MASK_DIR):
+    """Load mask_<class>.png for each class saved by the editor, skipping missing ones"""
+    masks = {}
+    for cls in classes:
+        mask = load_projector_mask(os.path.join(mask_dir, f"mask_{cls.lower()}.png"), size)
+        if mask is None:
+            print(f"⚠️ No mask for '{cls}', skipping its layer")
+            continue
+        masks[cls] = mask
+    return masks
+
+
+def claim_pixels(masks, order):
+    """Flat indices of the lit pixels each layer owns; earlier layers win where masks overlap"""
+    claimed = None
+    owned = {}
+    for name in order:
+        if name not in masks:
+            continue
+        mask = masks[name].reshape(-1) > 0
+        if claimed is None:
+            claimed = np.zeros(mask.shape, dtype=bool)
+        lit = np.flatnonzero(mask & ~claimed)
+        claimed[lit] = True
+        if len(lit):
+            owned[name] = lit
+    return owned
+
+
+class AnimationLayer:
+    """One animation clipped to the pixels of one class mask"""
+
+    def __init__(self, name, lit, source):
+        self.name = name
+        self.lit = lit  # flat indices of the output pixels this layer owns
+        self.source = source
+        self.frames = iter(source)
+        self.frame = None
+        self.remaining_ms = 0.0
+        self.scratch = np.empty((len(lit), 3), dtype=np.uint8)
+        self.advance_s = 0.0
+        self.blend_s = 0.0
+
+    def advance(self, dt_ms):
+        # Step through the layer's own frame durations so each clip keeps its authored speed
+        self.remaining_ms -= dt_ms
+        while self.frame is None or self.remaining_ms <= 0:
+            self.frame, duration = next(self.frames)
+            self.remaining_ms += duration
+
+
+class LayerCompositor:
+    """Composite several class-masked animations into one output frame.
+
+    Each output pixel belongs to at most one layer, decided once from the masks,
+    so a frame costs one gather/scatter over the lit pixels and nothing else.
+    """
+
+    def __init__(self, masks, layers, size, frame_ms=1000 / 30, buffer_size=4):
+        self.frame_ms = frame_ms
+        self.layers = []
+        owned = claim_pixels(masks, layers.keys())
+        for cls, gif_path in layers.items():
+            if cls not in owned:
+                continue
+            # Each layer's stream only resizes its own mask's lit tiles
+            stream = GifFrameStream(gif_path, size, buffer_size, mask=masks[cls])
+            self.layers.append(AnimationLayer(cls, owned[cls], stream))
+        self.composed = 0
+        self.window_start = time.monotonic()
+
+    def start(self):
+        for layer in self.layers:
+            layer.source.start()
+        return self
+
+    def stop(self):
+        for layer in self.layers:
+            layer.source.stop()
+        self.report()
+
+    def compose(self, out):
+        """Write the next output frame into out (h, w, 3); pixels outside every mask are left untouched"""
+        out_flat = out.reshape(-1, 3)
+        for layer in self.layers:
+            t0 = time.perf_counter()
+            layer.advance(self.frame_ms)
+            t1 = time.perf_counter()
+            np.take(layer.frame.reshape(-1, 3), layer.lit, axis=0, out=layer.scratch)
+            out_flat[layer.lit] = layer.scratch
+            layer.advance_s += t1 - t0
+            layer.blend_s += time.perf_counter() - t1
+        self.composed += 1
+        if time.monotonic() - self.window_start >= 10:
+            self.report()
+
+    def report(self):
+        if not self.composed:
+            return
+        elapsed = time.monotonic() - self.window_start
+        print(f"🧩 Composited {self.composed / elapsed:.1f} fps over {len(self.layers)} layers")
+        for layer in self.layers:
+            print(f"   {layer.name}: {len(layer.lit)} px | wait {1000 * layer.advance_s / self.composed:.2f} ms"
+                  f" | blend {1000 * layer.blend_s / self.composed:.2f} ms")
+            layer.advance_s = layer.blend_s = 0.0
+        self.composed = 0
+        self.window_start = time.monotonic()
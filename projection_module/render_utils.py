@@ -0,0 +1,144 @@
+# projection_module/render_utils.py
+import time
+import bisect
+from collections import deque
+from multiprocessing import Pool, cpu_count
+import cv2
+import numpy as np
+from PIL import Image
+from projection_module.gif_utils import frame_duration
+from projection_module.layer_utils import claim_pixels
+from projection_module.store_utils import mask_bbox, FrameStoreWriter
+from projection_module.calibration_utils import load_projector_mask
+
+
+class GifTimeline:
+    """Random access to a GIF's frames by show time, decoding forward from the last frame used"""
+
+    def __init__(self, gif_path, size):
+        self.gif = Image.open(gif_path)
+        self.size = size
+        ends = []
+        total = 0
+        for i in range(getattr(self.gif, "n_frames", 1)):
+            self.gif.seek(i)
+            total += frame_duration(self.gif)
+            ends.append(total)
+        self.ends = ends
+        self.total_ms = total
+        self.index = -1
+        self.frame = None
+
+    def frame_at(self, t_ms):
+        index = bisect.bisect_right(self.ends, t_ms % self.total_ms)
+        if index != self.index:
+            self.gif.seek(index)
+            rgb = self.gif.convert("RGB").resize(self.size)
+            self.frame = np.ascontiguousarray(np.asarray(rgb)[..., ::-1])
+            self.index = index
+        return self.frame
+
+
+class VideoSink:
+    """Encode frames to an MP4/AVI as they arrive"""
+
+    def __init__(self, path, size, fps):
+        self.writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+
+    def write(self, frame, duration_ms):
+        self.writer.write(frame)
+
+    def close(self):
+        self.writer.release()
+
+
+def open_sink(path, size, fps, bbox=None):
+    # .frames stores play back memory-mapped with zero decode, anything else goes through the encoder
+    if path.endswith(".frames"):
+        return FrameStoreWriter(path, size, bbox)
+    return VideoSink(path, size, fps)
+
+
+def load_masks(animations, size):
+    masks = {}
+    for i, (gif_path, mask_path) in enumerate(animations):
+        mask = load_projector_mask(mask_path, size)
+        if mask is None:
+            raise FileNotFoundError(f"Could not load mask {mask_path}")
+        masks[i] = mask
+    return masks
+
+
+# Per-process render state, filled once by the pool initializer
+_worker = {}
+
+
+def _init_worker(animations, size, fps, bbox):
+    masks = load_masks(animations, size)
+    owned = claim_pixels(masks, range(len(animations)))
+    w = size[0]
+    x, y, cw, _ = bbox
+    layers = []
+    for i, lit in owned.items():
+        # Same pixels as flat indices into the bbox crop the worker renders
+        lit_crop = (lit // w - y) * cw + (lit % w - x)
+        layers.append((GifTimeline(animations[i][0], size), lit, lit_crop))
+    _worker["layers"] = layers
+    _worker["bbox"] = bbox
+    _worker["fps"] = fps
+
+
+def _render_chunk(chunk):
+    # Only the lit bbox goes back to the parent, the rest of every frame is black anyway
+    start, count = chunk
+    _, _, cw, ch = _worker["bbox"]
+    frames = np.zeros((count, ch, cw, 3), dtype=np.uint8)
+    for n in range(count):
+        t_ms = 1000 * (start + n) / _worker["fps"]
+        out_flat = frames[n].reshape(-1, 3)
+        for timeline, lit, lit_crop in _worker["layers"]:
+            out_flat[lit_crop] = timeline.frame_at(t_ms).reshape(-1, 3)[lit]
+    return frames
+
+
+def render_show(animations, duration, output, fps=30, size=(1280, 768), workers=None, chunk=12):
+    """Composite (gif_path, mask_path) layers for `duration` seconds into `output` using a process pool.
+
+    Chunks of consecutive frames are rendered in parallel and written in order, with at most
+    two chunks per worker in flight so memory stays flat however long the show is. Workers
+    send back only the crop around the lit pixels, which is pasted into one reused canvas.
+    """
+    workers = workers or cpu_count()
+    total = int(duration * fps)
+    chunks = [(s, min(chunk, total - s)) for s in range(0, total, chunk)]
+    union = np.maximum.reduce(list(load_masks(animations, size).values()))
+    bbox = mask_bbox(union)
+    x, y, cw, ch = bbox
+    sink = open_sink(output, size, fps, bbox)
+    canvas = np.zeros((size[1], size[0], 3), dtype=np.uint8)
+    frame_ms = 1000 / fps
+    start = time.monotonic()
+    written = 0
+
+    def write_chunk(crops):
+        nonlocal written
+        for crop in crops:
+            canvas[y:y + ch, x:x + cw] = crop
+            sink.write(canvas, frame_ms)
+            written += 1
+
+    try:
+        with Pool(workers, initializer=_init_worker, initargs=(animations, size, fps, bbox)) as pool:
+            pending = deque()
+            for c in chunks:
+                pending.append(pool.apply_async(_render_chunk, (c,)))
+                if len(pending) < 2 * workers:
+                    continue
+                write_chunk(pending.popleft().get())
+            while pending:
+                write_chunk(pending.popleft().get())
+    finally:
+        sink.close()
+    elapsed = time.monotonic() - start
+    print(f"🎬 Rendered {written} frames to {output} in {elapsed:.1f}s ({written / max(elapsed, 1e-6):.1f} fps, {workers} workers)")
+    return output
@@ -0,0 +1,54 @@
+# projection_module/roi_utils.py
+import cv2
+import numpy as np
+
+
+def mask_tiles(mask, tile=32):
+    """(x, y, w, h) strips covering every tile-sized block of the mask with a lit pixel.
+
+    Horizontally adjacent lit blocks are merged into one strip to keep the count low.
+    """
+    h, w = mask.shape[:2]
+    lit = mask > 0
+    blocks = np.logical_or.reduceat(np.logical_or.reduceat(lit, np.arange(0, h, tile), axis=0),
+                                    np.arange(0, w, tile), axis=1)
+    tiles = []
+    for r, row in enumerate(blocks):
+        padded = np.concatenate([[False], row, [False]])
+        runs = np.flatnonzero(padded[1:] != padded[:-1]).reshape(-1, 2)
+        y0 = r * tile
+        y1 = min(y0 + tile, h)
+        for c0, c1 in runs:
+            x0 = c0 * tile
+            x1 = min(c1 * tile, w)
+            tiles.append((int(x0), int(y0), int(x1 - x0), int(y1 - y0)))
+    return tiles
+
+
+class RoiCompositor:
+    """Resize and mask a source frame into the output only inside the mask's lit tiles.
+
+    Each tile samples the source exactly where a full-frame cv2.resize would, so the
+    result matches resize-then-mask, but pixels outside the tiles are never touched
+    and stay black in the (reused) output buffer.
+    """
+
+    def __init__(self, mask, src_size, tile=32):
+        h, w = mask.shape[:2]
+        sx = src_size[0] / w
+        sy = src_size[1] / h
+        self.tiles = []
+        for x, y, tw, th in mask_tiles(mask, tile):
+            # Inverse map output pixel (x + i, y + j) to the same source point cv2.resize uses
+            M = np.float32([[sx, 0, (x + 0.5) * sx - 0.5], [0, sy, (y + 0.5) * sy - 0.5]])
+            lit = mask[y:y + th, x:x + tw, None] > 0
+            self.tiles.append(((x, y, tw, th), M, lit, np.empty((th, tw, 3), dtype=np.uint8)))
+        self.coverage = sum(t[0][2] * t[0][3] for t in self.tiles) / float(w * h)
+
+    def composite(self, src, out, rgb=False):
+        """src is the undecimated source frame (BGR, or RGB with rgb=True), out is the (h, w, 3) BGR output"""
+        for (x, y, tw, th), M, lit, scratch in self.tiles:
+            cv2.warpAffine(src, M, (tw, th), dst=scratch, flags=cv2.INTER_LINEAR | cv2.WARP_INVERSE_MAP,
+                           borderMode=cv2.BORDER_REPLICATE)
+            np.copyto(out[y:y + th, x:x + tw], scratch[..., ::-1] if rgb else scratch, where=lit)
+        return out
@@ -0,0 +1,84 @@
+# projection_module/schedule_utils.py
+import time
+import statistics
+from collections import deque
+
+
+class FrameScheduler:
+    """Pace playback against a monotonic clock using each frame's own duration.
+
+    A frame whose whole slot has already passed is dropped only when a newer one is
+    already waiting; otherwise it is shown late and the clock restarts from now, so a
+    producer slightly slower than the target rate just plays slower. A frame shown
+    after its start deadline means the previous one stayed up too long, which is
+    counted as a repeat. Achieved fps and jitter are printed every report_every seconds.
+    """
+
+    def __init__(self, max_lag=1.0, report_every=10.0, tolerance=0.005):
+        self.max_lag = max_lag
+        self.report_every = report_every
+        self.tolerance = tolerance
+        self.deadline = None
+        self.errors = deque(maxlen=500)
+        self.shown = 0
+        self.dropped = 0
+        self.repeated = 0
+        self.window_start = None
+
+    def _start(self):
+        now = time.monotonic()
+        self.deadline = now
+        self.window_start = now
+
+    def should_drop(self, duration_ms, newer_waiting=False):
+        if self.deadline is None:
+            self._start()
+        lag = time.monotonic() - self.deadline
+        if lag > self.max_lag:
+            # Too far behind to catch up by dropping (e.g. after a stall), resync instead
+            print(f"⏱️ Playback stalled {lag:.2f}s, resyncing")
+            self.deadline = time.monotonic()
+            return False
+        if lag > duration_ms / 1000 and newer_waiting:
+            self.deadline += duration_ms / 1000
+            self.dropped += 1
+            return True
+        return False
+
+    def wait(self):
+        """Sleep until the current frame is due"""
+        if self.deadline is None:
+            self._start()
+        delay = self.deadline - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+    def presented(self, duration_ms):
+        now = time.monotonic()
+        error = now - self.deadline
+        if error > self.tolerance:
+            self.repeated += 1
+        self.errors.append(error * 1000)
+        self.shown += 1
+        # Never let the deadline trail the clock, or every later frame would count as late
+        self.deadline = max(self.deadline + duration_ms / 1000, now)
+        if now - self.window_start >= self.report_every:
+            self.report(now)
+
+    def stats(self, now=None):
+        now = time.monotonic() if now is None else now
+        elapsed = max(now - self.window_start, 1e-6)
+        return {
+            "fps": self.shown / elapsed,
+            "jitter_ms": statistics.pstdev(self.errors) if len(self.errors) > 1 else 0.0,
+            "dropped": self.dropped,
+            "repeated": self.repeated,
+        }
+
+    def report(self, now=None):
+        if self.window_start is None:
+            return
+        s = self.stats(now)
+        print(f"🎞️ {s['fps']:.1f} fps | jitter {s['jitter_ms']:.1f} ms | dropped {s['dropped']} | repeated {s['repeated']}")
+        self.window_start = time.monotonic() if now is None else now
+        self.shown = self.dropped = self.repeated = 0
@@ -0,0 +1,74 @@
+# projection_module/store_utils.py
+import os
+import struct
+import numpy as np
+
+# Layout: one 4 KiB header page, then `count` contiguous uint8 BGR crops of the
+# bbox (x, y, w, h) inside a width x height output, then `count` uint16 durations in ms.
+MAGIC = b"XMASFRMS"
+VERSION = 1
+HEADER = struct.Struct("<8sH6xIIIIIII")
+DATA_OFFSET = 4096
+
+
+def mask_bbox(mask):
+    """(x, y, w, h) of the mask's nonzero region, the whole frame if it is empty"""
+    ys, xs = np.nonzero(mask)
+    if len(xs) == 0:
+        h, w = mask.shape[:2]
+        return 0, 0, w, h
+    return int(xs.min()), int(ys.min()), int(xs.max() - xs.min() + 1), int(ys.max() - ys.min() + 1)
+
+
+class FrameStoreWriter:
+    """Stream frames into a .frames store, keeping only the bbox of each one"""
+
+    def __init__(self, path, size, bbox=None):
+        w, h = size
+        self.path = path
+        self.size = size
+        self.bbox = bbox or (0, 0, w, h)
+        self.durations = []
+        # Written to a temp file and renamed on close so readers never see a partial store
+        self.tmp_path = path + ".tmp"
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(bytes(DATA_OFFSET))
+
+    def write(self, frame, duration_ms):
+        x, y, cw, ch = self.bbox
+        self.file.write(np.ascontiguousarray(frame[y:y + ch, x:x + cw]).data)
+        self.durations.append(int(round(duration_ms)))
+
+    def close(self):
+        w, h = self.size
+        x, y, cw, ch = self.bbox
+        self.file.write(np.asarray(self.durations, dtype="<u2").tobytes())
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, w, h, x, y, cw, ch, len(self.durations)))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class FrameStore:
+    """Read-only, memory-mapped view of a .frames store; frames are paged in on demand"""
+
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            magic, version, w, h, x, y, cw, ch, count = HEADER.unpack(f.read(HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a frame store")
+        if count == 0:
+            raise ValueError(f"{path} has no frames")
+        self.path = path
+        self.size = (w, h)
+        self.bbox = (x, y, cw, ch)
+        self.frames = np.memmap(path, dtype=np.uint8, mode="r", offset=DATA_OFFSET, shape=(count, ch, cw, 3))
+        self.durations = np.memmap(path, dtype="<u2", mode="r", offset=DATA_OFFSET + self.frames.nbytes,
+                                   shape=(count,)).tolist()
+
+    @property
+    def full_frame(self):
+        return self.bbox == (0, 0) + self.size
+
+    def __len__(self):
+        return len(self.durations)
@@ -0,0 +1,28 @@
+# render_show.py
+import argparse
+from projection_module.render_utils import render_show
+
+
+def parse_animation(spec, default_mask):
+    # "gif" uses the default mask, "gif@mask.png" uses its own (e.g. a class mask)
+    gif_path, _, mask_path = spec.partition("@")
+    return gif_path, mask_path or default_mask
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pre-render a masked light show offline")
+    parser.add_argument("animations", nargs="+", help="gif or gif@mask.png, earlier layers win where masks overlap")
+    parser.add_argument("--mask", default="mask_dynamic.png")
+    parser.add_argument("--duration", type=float, default=60, help="seconds")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--output", default="masked_projection.frames", help=".frames for zero-decode playback, or .mp4")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--play", action="store_true", help="project the result when done")
+    args = parser.parse_args()
+
+    animations = [parse_animation(spec, args.mask) for spec in args.animations]
+    output = render_show(animations, args.duration, args.output, fps=args.fps, workers=args.workers)
+
+    if args.play:
+        from projection import play_rendered_show
+        play_rendered_show(output)
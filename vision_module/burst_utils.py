@@ -0,0 +1,56 @@
+# vision_module/burst_utils.py
+import time
+import cv2
+import numpy as np
+from vision_module.capture_utils import get_camera
+
+
+def align_frames(frames, downscale=4):
+    """Shift every frame onto the first one (handheld/wind wobble), translation only"""
+    def small_gray(f):
+        g = cv2.cvtColor(f, cv2.COLOR_BGR2GRAY)
+        return np.float32(cv2.resize(g, (g.shape[1] // downscale, g.shape[0] // downscale), interpolation=cv2.INTER_AREA))
+
+    ref = small_gray(frames[0])
+    window = cv2.createHanningWindow(ref.shape[::-1], cv2.CV_32F)
+    h, w = frames[0].shape[:2]
+    aligned = [frames[0]]
+    for f in frames[1:]:
+        (dx, dy), _ = cv2.phaseCorrelate(ref, small_gray(f), window)
+        M = np.float32([[1, 0, -dx * downscale], [0, 1, -dy * downscale]])
+        aligned.append(cv2.warpAffine(f, M, (w, h), borderMode=cv2.BORDER_REPLICATE))
+    return aligned
+
+
+def merge_median(frames):
+    """Per-pixel temporal median: kills sensor noise and anything that moved through one frame"""
+    stack = np.stack(frames)
+    # Partitioning to the middle element is much cheaper than a full sort per pixel
+    mid = len(frames) // 2
+    return np.partition(stack, mid, axis=0)[mid]
+
+
+def merge_exposure_fusion(frames):
+    """Mertens exposure fusion; best with a bracketed burst, still lifts shadows on a plain one"""
+    fused = cv2.createMergeMertens().process(frames)
+    return np.clip(fused * 255, 0, 255).astype(np.uint8)
+
+
+def capture_clean_image(n=5, merge="median", size=(640, 480)):
+    """Burst-capture from the warm camera, align and merge into one clean frame for YOLO"""
+    start = time.monotonic()
+    camera = get_camera(size)
+    if merge == "fusion":
+        frames = camera.capture_burst(n, evs=(-1, 0, 1))
+    else:
+        frames = camera.capture_burst(n)
+    grabbed = time.monotonic()
+    frames = align_frames(frames)
+    if merge == "fusion":
+        image = merge_exposure_fusion(frames)
+    else:
+        image = merge_median(frames)
+    print(f"📸 Burst of {len(frames)} ({merge}): capture {1000 * (grabbed - start):.0f} ms,"
+          f" align+merge {1000 * (time.monotonic() - grabbed):.0f} ms")
+    camera.archive(image)
+    return image
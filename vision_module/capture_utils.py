@@ -1,10 +1,172 @@
-import os
+import glob
+import time
+import queue
+import threading
 from datetime import datetime
 import cv2
+import numpy as np
 
-def capture_image():
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"captured_image_{timestamp}.jpg"
-    os.system(f"libcamera-still -o {filename} --width 640 --height 480 --timeout 1000")
-    print(f"📷 Image saved to {filename}")
-    return cv2.imread(filename)
+
+class Picamera2Source:
+    """In-process libcamera stream; frames come back as BGR arrays with no file round trip"""
+
+    def __init__(self, size=(640, 480)):
+        from picamera2 import Picamera2
+        self.cam = Picamera2()
+        size = size or self.cam.sensor_resolution
+        # RGB888 is laid out B, G, R in memory, i.e. what OpenCV expects
+        self.cam.configure(self.cam.create_still_configuration(main={"size": tuple(size), "format": "RGB888"},
+                                                               buffer_count=2))
+        self.cam.start()
+
+    def read(self):
+        return self.cam.capture_array("main")
+
+    def set_exposure_value(self, ev):
+        self.cam.set_controls({"ExposureValue": float(ev)})
+        # New controls land a couple of frames later, drop the ones still in flight
+        for _ in range(2):
+            self.cam.capture_array("main")
+
+    def stop(self):
+        self.cam.stop()
+        self.cam.close()
+
+
+class OpenCVSource:
+    """V4L2 camera through cv2.VideoCapture, kept open between captures"""
+
+    def __init__(self, size=(640, 480), index=0):
+        self.cap = cv2.VideoCapture(index)
+        # VideoCapture never raises on a missing device, so check here and let open_source fall through
+        if not self.cap.isOpened():
+            raise RuntimeError(f"No camera at index {index}")
+        if size:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        ret, _ = self.cap.read()
+        if not ret:
+            self.cap.release()
+            raise RuntimeError(f"Camera at index {index} returned no frame")
+
+    def read(self):
+        self.cap.grab()  # drop the frame sitting in the driver queue so we get a fresh one
+        ret, frame = self.cap.read()
+        if not ret:
+            raise RuntimeError("Failed to capture image")
+        return frame
+
+    def stop(self):
+        self.cap.release()
+
+
+class FakeFrameSource:
+    """Off-Pi stand-in: cycles through saved captures, or a synthetic gradient if there are none"""
+
+    def __init__(self, size=(640, 480), pattern="captured_image_*.jpg"):
+        self.frames = [f for f in (cv2.imread(p) for p in sorted(glob.glob(pattern))) if f is not None]
+        if size:
+            self.frames = [cv2.resize(f, tuple(size)) for f in self.frames]
+        if not self.frames:
+            w, h = size or (640, 480)
+            ramp = np.linspace(0, 255, w, dtype=np.uint8)
+            self.frames = [np.dstack([np.tile(ramp, (h, 1))] * 3)]
+        self.index = 0
+
+    def read(self):
+        frame = self.frames[self.index % len(self.frames)]
+        self.index += 1
+        return frame.copy()
+
+    def stop(self):
+        pass
+
+
+def open_source(size=(640, 480)):
+    for source in (Picamera2Source, OpenCVSource):
+        try:
+            return source(size)
+        except Exception as e:
+            print(f"⚠️ {source.__name__} unavailable: {e}")
+    print("⚠️ No camera found, using fake frames")
+    return FakeFrameSource(size)
+
+
+class CameraService:
+    """Keep one camera open and warm, hand frames back in memory and archive them to disk in the background"""
+
+    def __init__(self, source, archive=True, warmup_frames=3):
+        self.source = source
+        self.lock = threading.Lock()
+        self.archive_queue = queue.Queue() if archive else None
+        if archive:
+            threading.Thread(target=self._archive_loop, daemon=True).start()
+        # A few throwaway frames let auto exposure / white balance settle once, not per press
+        for _ in range(warmup_frames):
+            source.read()
+
+    def capture(self):
+        start = time.monotonic()
+        with self.lock:
+            frame = self.source.read()
+        print(f"📷 Captured {frame.shape[1]}x{frame.shape[0]} in {1000 * (time.monotonic() - start):.0f} ms")
+        self.archive(frame)
+        return frame
+
+    def archive(self, frame):
+        if self.archive_queue is not None:
+            self.archive_queue.put((datetime.now(), frame))
+
+    def capture_burst(self, n=5, evs=None):
+        """Grab n frames back to back; with evs (e.g. (-1, 0, 1)) bracket exposure where the source supports it"""
+        frames = []
+        with self.lock:
+            if evs and hasattr(self.source, "set_exposure_value"):
+                for ev in evs:
+                    self.source.set_exposure_value(ev)
+                    frames.append(self.source.read())
+                self.source.set_exposure_value(0)
+            else:
+                frames = [self.source.read() for _ in range(n)]
+        return frames
+
+    def _archive_loop(self):
+        while True:
+            when, frame = self.archive_queue.get()
+            filename = f"captured_image_{when.strftime('%Y%m%d_%H%M%S')}.jpg"
+            cv2.imwrite(filename, frame)
+            print(f"📷 Image saved to {filename}")
+
+    def stop(self):
+        with self.lock:
+            self.source.stop()
+
+
+_camera = None
+_camera_size = None
+_camera_lock = threading.Lock()
+
+
+def get_camera(size=(640, 480), source=None):
+    """Process-wide camera service, reopened only if the requested size changes; pass source to inject one (e.g. FakeFrameSource)"""
+    global _camera, _camera_size
+    with _camera_lock:
+        if source is not None or _camera is None or _camera_size != size:
+            if _camera is not None:
+                _camera.stop()
+            _camera = CameraService(source or open_source(size))
+            _camera_size = size
+        return _camera
+
+
+def start_camera_in_background(size=(640, 480)):
+    """Open and warm the camera on a daemon thread so the first press doesn't pay for it"""
+    thread = threading.Thread(target=get_camera, args=(size,), daemon=True)
+    thread.start()
+    return thread
+
+
+def capture_image(width=640, height=480):
+    """Pass width=None, height=None for the full sensor resolution (use with tiled inference)"""
+    return get_camera((width, height) if width and height else None).capture()
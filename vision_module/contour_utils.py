@@ -0,0 +1,102 @@
+# vision_module/contour_utils.py
+import math
+import cv2
+import numpy as np
+
+# Smoothing and cleanup per class. run_yolo simplifies trim/roof hard and drops short roof
+# edges; the editor keeps every class close to the raw outline so points can be dragged.
+YOLO_RULES = {"epsilon": 0.005, "trim_epsilon": 0.05, "roof_epsilon": 0.05, "roof_min_edge": 10}
+EDITOR_RULES = {"epsilon": 0.005, "trim_epsilon": 0.005, "roof_epsilon": None, "roof_min_edge": None}
+
+
+def _instance_contours(mask, box, region):
+    """Contours of one instance mask in image coords, resizing only its box instead of the whole frame.
+
+    region (x, y, w, h) is the part of the image the mask covers: the whole image
+    normally, a tile for tiled inference.
+    """
+    mh, mw = mask.shape
+    rx, ry, width, height = region
+    sx, sy = mw / width, mh / height
+    x1, y1, x2, y2 = box[0] - rx, box[1] - ry, box[2] - rx, box[3] - ry
+    mx0 = max(int(math.floor(x1 * sx)) - 1, 0)
+    my0 = max(int(math.floor(y1 * sy)) - 1, 0)
+    mx1 = min(int(math.ceil(x2 * sx)) + 1, mw)
+    my1 = min(int(math.ceil(y2 * sy)) + 1, mh)
+    if mx1 <= mx0 or my1 <= my0:
+        return []
+    ix0, iy0 = int(round(mx0 / sx)), int(round(my0 / sy))
+    iw = max(min(int(round(mx1 / sx)), width) - ix0, 1)
+    ih = max(min(int(round(my1 / sy)), height) - iy0, 1)
+    crop = cv2.resize(mask[my0:my1, mx0:mx1] * 255, (iw, ih))
+    cnts, _ = cv2.findContours(crop, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE, offset=(int(rx) + ix0, int(ry) + iy0))
+    return cnts
+
+
+def contour_stats(cnts):
+    """Area, closed perimeter and bounding rect of every contour at once"""
+    lengths = np.array([len(c) for c in cnts])
+    starts = np.concatenate([[0], np.cumsum(lengths)[:-1]])
+    pts = np.concatenate([c.reshape(-1, 2) for c in cnts]).astype(np.float64)
+    # Index of each point's successor, wrapping within its own contour
+    nxt = np.arange(1, len(pts) + 1)
+    nxt[starts + lengths - 1] = starts
+    nx, ny = pts[nxt, 0], pts[nxt, 1]
+    area = np.abs(np.add.reduceat(pts[:, 0] * ny - nx * pts[:, 1], starts)) / 2
+    perimeter = np.add.reduceat(np.hypot(nx - pts[:, 0], ny - pts[:, 1]), starts)
+    x0 = np.minimum.reduceat(pts[:, 0], starts)
+    y0 = np.minimum.reduceat(pts[:, 1], starts)
+    w = np.maximum.reduceat(pts[:, 0], starts) - x0 + 1
+    h = np.maximum.reduceat(pts[:, 1], starts) - y0 + 1
+    return area, perimeter, np.stack([x0, y0, w, h], axis=1).astype(np.int32)
+
+
+def drop_short_edges(poly, min_edge):
+    pts = poly.reshape(-1, 2)
+    edge = np.hypot(*(pts - np.roll(pts, -1, axis=0)).T)
+    return pts[edge > min_edge].astype(np.int32).reshape(-1, 1, 2)
+
+
+def postprocess(detections, width, height, indices=None, visible=None, rules=YOLO_RULES, min_area=100):
+    """Turn instance masks into editable contours, returns {detection index: [(cnt, class_name), ...]}"""
+    if detections["masks"] is None:
+        return {}
+    if indices is None:
+        indices = range(len(detections["masks"]))
+    names = detections["names"]
+    regions = detections.get("regions")
+
+    cnts, owners = [], []
+    for i in indices:
+        class_name = names[int(detections["classes"][i])]
+        if visible and class_name not in visible:
+            continue
+        region = (0, 0, width, height) if regions is None else regions[i]
+        found = _instance_contours(detections["masks"][i], detections["boxes"][i], region)
+        cnts.extend(found)
+        owners.extend([i] * len(found))
+
+    out = {i: [] for i in indices}
+    if not cnts:
+        return out
+
+    area, perimeter, rects = contour_stats(cnts)
+    x, y, w, h = rects.T
+    rect_like = (0.4 < w / h) & (w / h < 2.5) & (area / (w * h) > 0.5)
+
+    for k in np.flatnonzero(area >= min_area):
+        i = owners[k]
+        class_name = names[int(detections["classes"][i])]
+        cls = class_name.lower()
+        if cls == "window" and rect_like[k]:
+            rect = np.array([[[x[k], y[k]]], [[x[k] + w[k], y[k]]], [[x[k] + w[k], y[k] + h[k]]], [[x[k], y[k] + h[k]]]])
+            out[i].append((rect, class_name))
+        elif cls == "trim":
+            out[i].append((cv2.approxPolyDP(cnts[k], rules["trim_epsilon"] * perimeter[k], False), class_name))
+        elif cls == "roof" and rules["roof_min_edge"] is not None:
+            smoothed = cv2.approxPolyDP(cnts[k], rules["roof_epsilon"] * perimeter[k], True)
+            if len(smoothed) > 2:
+                out[i].append((drop_short_edges(smoothed, rules["roof_min_edge"]), class_name))
+        else:
+            out[i].append((cv2.approxPolyDP(cnts[k], rules["epsilon"] * perimeter[k], True), class_name))
+    return out
@@ -0,0 +1,85 @@
+# vision_module/history_utils.py
+from collections import deque
+import numpy as np
+
+
+# Each edit is a small command that knows how to apply and revert itself against a
+# ContourStore, so the history holds per-operation diffs instead of list snapshots.
+# Commands address contours by list index, which stays valid because undo and redo
+# always replay them in strict LIFO order.
+
+class MovePoint:
+    def __init__(self, idx, pt_idx, old, new):
+        self.idx, self.pt_idx = idx, pt_idx
+        self.old, self.new = old, new
+
+    def _move(self, store, pos):
+        store.move_point(self.idx, self.pt_idx, *pos)
+        store.refresh_bbox(self.idx)
+
+    def apply(self, store):
+        self._move(store, self.new)
+
+    def revert(self, store):
+        self._move(store, self.old)
+
+
+class DeletePoint:
+    def __init__(self, idx, pt_idx, point):
+        self.idx, self.pt_idx, self.point = idx, pt_idx, point
+
+    def apply(self, store):
+        cnt, class_name = store[self.idx]
+        store[self.idx] = (np.delete(cnt, self.pt_idx, axis=0), class_name)
+
+    def revert(self, store):
+        cnt, class_name = store[self.idx]
+        store[self.idx] = (np.insert(cnt, self.pt_idx, self.point, axis=0), class_name)
+
+
+class DeleteContour:
+    def __init__(self, idx, item):
+        self.idx, self.item = idx, item
+
+    def apply(self, store):
+        store.pop(self.idx)
+
+    def revert(self, store):
+        store.insert(self.idx, self.item)
+
+
+class EditHistory:
+    """Bounded undo/redo stacks of commands; undo and redo are O(1) in the history size"""
+
+    def __init__(self, limit=200):
+        self.done = deque(maxlen=limit)  # oldest edits fall off once the limit is hit
+        self.undone = []
+
+    def clear(self):
+        self.done.clear()
+        self.undone.clear()
+
+    def do(self, store, command):
+        command.apply(store)
+        self.record(command)
+
+    def record(self, command):
+        """Push a command whose effect is already on the store (e.g. a finished drag)"""
+        self.done.append(command)
+        self.undone.clear()
+
+    def undo(self, store):
+        if not self.done:
+            return False
+        command = self.done.pop()
+        command.revert(store)
+        self.undone.append(command)
+        return True
+
+    def redo(self, store):
+        if not self.undone:
+            return False
+        command = self.undone.pop()
+        command.apply(store)
+        self.done.append(command)
+        return True
@@ -0,0 +1,180 @@
+# vision_module/index_utils.py
+import math
+from collections import defaultdict
+import cv2
+
+
+class ContourStore:
+    """The editor's [(cnt, class_name), ...] list plus spatial indexes for hit-testing.
+
+    Vertices live in a uniform grid of `cell` px buckets, polygons are registered in
+    every coarse `poly_cell` bucket their bounding box touches. Both are updated
+    incrementally on edits, so a click only looks at a handful of nearby candidates
+    however many contours there are. Every edit also records the rectangle it touched
+    (see take_dirty) so the preview can redraw just that area. Supports the list
+    operations the editor uses (iteration, len, indexing, item and slice assignment,
+    insert, pop, copy).
+    """
+
+    def __init__(self, items=(), cell=10, poly_cell=64):
+        self.cell = cell
+        self.poly_cell = poly_cell
+        self.replace_all(items)
+
+    # --- list interface ---
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __getitem__(self, idx):
+        return self.items[idx]
+
+    def __setitem__(self, idx, item):
+        if isinstance(idx, slice):
+            self.replace_all(item)
+            return
+        uid = self.uids[idx]
+        self._unindex(uid, self.items[idx][0])
+        self._mark(self.items[idx][0])
+        self.items[idx] = item
+        self._index(uid, item[0])
+        self._mark(item[0])
+
+    def copy(self):
+        return list(self.items)
+
+    def pop(self, idx):
+        uid = self.uids.pop(idx)
+        item = self.items.pop(idx)
+        self._unindex(uid, item[0])
+        self._mark(item[0])
+        self.pos = {uid: i for i, uid in enumerate(self.uids)}
+        return item
+
+    def insert(self, idx, item):
+        uid = self.next_uid
+        self.next_uid += 1
+        self.items.insert(idx, item)
+        self.uids.insert(idx, uid)
+        self.pos = {uid: i for i, uid in enumerate(self.uids)}
+        self._index(uid, item[0])
+        self._mark(item[0])
+
+    def replace_all(self, items):
+        self.items = []
+        self.uids = []
+        self.vertex_cells = defaultdict(set)
+        self.poly_cells = defaultdict(set)
+        self.poly_keys = {}
+        self.pos = {}
+        self.next_uid = 0
+        self.dirty = []
+        self.full_dirty = True
+        for item in list(items):
+            self.append(item)
+        self.dirty = []  # already covered by full_dirty
+
+    def append(self, item):
+        uid = self.next_uid
+        self.next_uid += 1
+        self.items.append(item)
+        self.uids.append(uid)
+        self.pos[uid] = len(self.uids) - 1
+        self._index(uid, item[0])
+        self._mark(item[0])
+
+    # --- index maintenance ---
+
+    def _key(self, x, y):
+        return int(x) // self.cell, int(y) // self.cell
+
+    def _index(self, uid, cnt):
+        for pt_idx, (x, y) in enumerate(cnt.reshape(-1, 2)):
+            self.vertex_cells[self._key(x, y)].add((uid, pt_idx))
+        self._index_bbox(uid, cnt)
+
+    def _unindex(self, uid, cnt):
+        for pt_idx, (x, y) in enumerate(cnt.reshape(-1, 2)):
+            self.vertex_cells[self._key(x, y)].discard((uid, pt_idx))
+        for key in self.poly_keys.pop(uid, ()):
+            self.poly_cells[key].discard(uid)
+
+    def _index_bbox(self, uid, cnt):
+        for key in self.poly_keys.pop(uid, ()):
+            self.poly_cells[key].discard(uid)
+        x, y, w, h = cv2.boundingRect(cnt)
+        c = self.poly_cell
+        keys = [(cx, cy) for cx in range(x // c, (x + w) // c + 1) for cy in range(y // c, (y + h) // c + 1)]
+        for key in keys:
+            self.poly_cells[key].add(uid)
+        self.poly_keys[uid] = keys
+
+    def move_point(self, idx, pt_idx, x, y):
+        """Drag one vertex; only its grid bucket changes (call refresh_bbox when the drag ends)"""
+        uid = self.uids[idx]
+        cnt = self.items[idx][0]
+        old = self._key(*cnt[pt_idx][0])
+        new = self._key(x, y)
+        if old != new:
+            self.vertex_cells[old].discard((uid, pt_idx))
+            self.vertex_cells[new].add((uid, pt_idx))
+        # Grow the polygon buckets to cover the new position so rect queries stay a superset
+        key = (int(x) // self.poly_cell, int(y) // self.poly_cell)
+        if key not in self.poly_keys[uid]:
+            self.poly_keys[uid].append(key)
+            self.poly_cells[key].add(uid)
+        # Only the two edges meeting at this vertex change
+        n = len(cnt)
+        pts = [cnt[(pt_idx - 1) % n][0], cnt[pt_idx][0], cnt[(pt_idx + 1) % n][0], (x, y)]
+        xs, ys = [int(p[0]) for p in pts], [int(p[1]) for p in pts]
+        self.dirty.append((min(xs), min(ys), max(xs) + 1, max(ys) + 1))
+        cnt[pt_idx][0] = [x, y]
+
+    def refresh_bbox(self, idx):
+        self._index_bbox(self.uids[idx], self.items[idx][0])
+
+    def _mark(self, cnt):
+        x, y, w, h = cv2.boundingRect(cnt)
+        self.dirty.append((x, y, x + w, y + h))
+
+    def take_dirty(self):
+        """(full, rects) touched since the last call; full means everything changed"""
+        full, rects = self.full_dirty, self.dirty
+        self.full_dirty, self.dirty = False, []
+        return full, rects
+
+    # --- queries ---
+
+    def find_vertex(self, x, y, radius=10):
+        """(contour idx, point idx) of the first vertex within radius px (square), in list order, or None"""
+        r = math.ceil(radius / self.cell)
+        kx, ky = self._key(x, y)
+        best = None
+        for cx in range(kx - r, kx + r + 1):
+            for cy in range(ky - r, ky + r + 1):
+                for uid, pt_idx in self.vertex_cells.get((cx, cy), ()):
+                    idx = self.pos[uid]
+                    px, py = self.items[idx][0][pt_idx][0]
+                    if abs(px - x) < radius and abs(py - y) < radius and (best is None or (idx, pt_idx) < best):
+                        best = (idx, pt_idx)
+        return best
+
+    def find_polygon(self, x, y):
+        """Index of the first contour (in list order) containing the point, or None"""
+        candidates = sorted(self.pos[uid] for uid in self.poly_cells.get((x // self.poly_cell, y // self.poly_cell), ()))
+        for idx in candidates:
+            if cv2.pointPolygonTest(self.items[idx][0], (x, y), False) >= 0:
+                return idx
+        return None
+
+    def indices_in_rect(self, x0, y0, x1, y1):
+        """Indices (in list order) of contours whose bounding box may overlap the rect"""
+        c = self.poly_cell
+        uids = set()
+        for cx in range(x0 // c, (x1 - 1) // c + 1):
+            for cy in range(y0 // c, (y1 - 1) // c + 1):
+                uids.update(self.poly_cells.get((cx, cy), ()))
+        return sorted(self.pos[uid] for uid in uids)
@@ -0,0 +1,91 @@
+# vision_module/model_utils.py
+import time
+import threading
+import numpy as np
+
+MODEL_PATH = "vision_module/best.pt"
+ONNX_PATH = "vision_module/best.onnx"
+ONNX_INT8_PATH = "vision_module/best_int8.onnx"  # written by `python -m vision_module.onnx_utils --int8`
+
+# "torch" runs best.pt through ultralytics, "onnx" runs ONNX_MODEL through onnxruntime
+DEFAULT_BACKEND = "torch"
+# Which export the onnx backend loads; set to ONNX_INT8_PATH (or pass model_path) to run the quantized model
+ONNX_MODEL = ONNX_PATH
+
+# One model per weights file for the whole process, loaded on first use
+_models = {}
+_segmenters = {}
+_lock = threading.Lock()
+_segmenter_lock = threading.Lock()
+
+
+def get_model(path=MODEL_PATH, warmup=True):
+    with _lock:
+        if path not in _models:
+            start = time.monotonic()
+            from ultralytics import YOLO  # deferred so boot doesn't pay for torch
+            model = YOLO(path)
+            print(f"🧠 Loaded {path} in {time.monotonic() - start:.1f}s")
+            if warmup:
+                # First predict allocates buffers and fuses layers, pay for it before a user is waiting
+                start = time.monotonic()
+                model.predict(source=np.zeros((480, 640, 3), dtype=np.uint8), verbose=False, task='segment')
+                print(f"🔥 Warmed up {path} in {time.monotonic() - start:.1f}s")
+            _models[path] = model
+        return _models[path]
+
+
+class TorchSegmenter:
+    """Ultralytics/torch backend"""
+
+    def __init__(self, path=MODEL_PATH):
+        self.model = get_model(path)
+
+    def _to_detections(self, result):
+        boxes = result.boxes.data.cpu().numpy()
+        masks = None
+        if result.masks is not None:
+            masks = result.masks.data.cpu().numpy().astype(np.uint8)
+        else:
+            boxes = boxes[:0]
+        return {"masks": masks, "boxes": boxes[:, :4], "scores": boxes[:, 4], "classes": boxes[:, 5],
+                "names": result.names}
+
+    def predict(self, image, conf=0.01):
+        results = self.model.predict(source=image, conf=conf, verbose=False, task='segment')
+        return self._to_detections(results[0])
+
+    def predict_batch(self, images, conf=0.01):
+        # ultralytics stacks a list source into one batch
+        results = self.model.predict(source=list(images), conf=conf, verbose=False, task='segment')
+        return [self._to_detections(r) for r in results]
+
+
+def get_segmenter(backend=None, model_path=None):
+    """Shared segmenter per (backend, weights); model_path defaults to MODEL_PATH for torch and ONNX_MODEL for onnx"""
+    backend = backend or DEFAULT_BACKEND
+    with _segmenter_lock:
+        if backend == "torch":
+            key = (backend, model_path or MODEL_PATH)
+            if key not in _segmenters:
+                _segmenters[key] = TorchSegmenter(key[1])
+        elif backend == "onnx":
+            key = (backend, model_path or ONNX_MODEL)
+            if key not in _segmenters:
+                from vision_module.onnx_utils import OnnxSegmenter
+                _segmenters[key] = OnnxSegmenter(key[1])
+        else:
+            raise ValueError(f"Unknown inference backend '{backend}'")
+        return _segmenters[key]
+
+
+def detect(image, conf=0.01, backend=None, model_path=None):
+    """Segment an image; returns raw 0/1 instance masks, xyxy boxes in image coords, scores, class ids and the class names"""
+    return get_segmenter(backend, model_path).predict(image, conf)
+
+
+def warm_up_in_background(backend=None, model_path=None):
+    """Load and warm the model on a daemon thread so it's ready by the first photo"""
+    thread = threading.Thread(target=get_segmenter, args=(backend, model_path), daemon=True)
+    thread.start()
+    return thread
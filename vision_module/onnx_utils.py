@@ -0,0 +1,157 @@
+# vision_module/onnx_utils.py
+import os
+import ast
+import time
+import argparse
+import cv2
+import numpy as np
+from vision_module.model_utils import MODEL_PATH, ONNX_PATH, get_segmenter
+from vision_module.contour_utils import EDITOR_RULES, postprocess
+
+
+def export_onnx(pt_path=MODEL_PATH, imgsz=(480, 640), int8=False):
+    """Export best.pt to ONNX (and optionally an int8 dynamically-quantized copy), returns the path to use"""
+    from ultralytics import YOLO
+    # 480x640 matches the capture size, so no letterbox padding is wasted on inference
+    onnx_path = YOLO(pt_path).export(format="onnx", imgsz=list(imgsz), simplify=True)
+    if not int8:
+        return onnx_path
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    int8_path = os.path.splitext(onnx_path)[0] + "_int8.onnx"
+    quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QUInt8)
+    print(f"🗜️ Quantized {onnx_path} -> {int8_path}")
+    return int8_path
+
+
+class OnnxSegmenter:
+    """YOLO segmentation through onnxruntime alone, no torch needed at runtime.
+
+    Mirrors ultralytics' letterbox, NMS and mask decoding and returns the same
+    detections dict as the torch backend, with masks trimmed of letterbox padding.
+    """
+
+    def __init__(self, onnx_path=ONNX_PATH, threads=4, iou=0.7, max_det=300):
+        import onnxruntime as ort
+        start = time.monotonic()
+        opts = ort.SessionOptions()
+        opts.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(onnx_path, opts, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+        self.imgsz = tuple(self.session.get_inputs()[0].shape[2:])
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.names = ast.literal_eval(meta["names"]) if "names" in meta else {}
+        self.iou = iou
+        self.max_det = max_det
+        print(f"🧠 Loaded {onnx_path} in {time.monotonic() - start:.1f}s")
+
+    def letterbox(self, image):
+        h, w = image.shape[:2]
+        th, tw = self.imgsz
+        r = min(th / h, tw / w)
+        nw, nh = int(round(w * r)), int(round(h * r))
+        left, top = (tw - nw) // 2, (th - nh) // 2
+        canvas = np.full((th, tw, 3), 114, dtype=np.uint8)
+        canvas[top:top + nh, left:left + nw] = cv2.resize(image, (nw, nh), interpolation=cv2.INTER_LINEAR)
+        blob = np.ascontiguousarray(canvas[..., ::-1].transpose(2, 0, 1)[None], dtype=np.float32) / 255.0
+        return blob, (left, top, nw, nh)
+
+    def predict(self, image, conf=0.01):
+        blob, (left, top, nw, nh) = self.letterbox(image)
+        preds, protos = self.session.run(None, {self.input_name: blob})
+        preds = preds[0].T  # (anchors, 4 + classes + mask coefficients)
+        nm = protos.shape[1]
+        nc = preds.shape[1] - 4 - nm
+        class_scores = preds[:, 4:4 + nc]
+        classes = class_scores.argmax(1)
+        scores = class_scores[np.arange(len(preds)), classes]
+        keep = scores >= conf
+        preds, classes, scores = preds[keep], classes[keep], scores[keep]
+
+        # Class-aware NMS like ultralytics (agnostic=False)
+        xywh = preds[:, :4].copy()
+        xywh[:, :2] -= xywh[:, 2:] / 2
+        idx = np.asarray(cv2.dnn.NMSBoxesBatched(xywh.tolist(), scores.tolist(), classes.tolist(), conf, self.iou),
+                         dtype=np.int64).reshape(-1)[:self.max_det]
+        names = self.names or {i: str(i) for i in range(nc)}
+        if len(idx) == 0:
+            return {"masks": None, "boxes": np.zeros((0, 4), np.float32), "scores": np.zeros(0, np.float32),
+                    "classes": np.zeros(0, np.float32), "names": names}
+
+        # Masks: sigmoid(coeffs @ protos), cropped to each box, upsampled to the input, padding removed
+        _, _, ph, pw = protos.shape
+        th, tw = self.imgsz
+        coeffs = preds[idx, 4 + nc:]
+        masks = 1 / (1 + np.exp(-(coeffs @ protos[0].reshape(nm, -1)))).reshape(-1, ph, pw)
+        xyxy = np.concatenate([xywh[idx, :2], xywh[idx, :2] + xywh[idx, 2:]], axis=1)  # letterbox input coords
+        boxes = xyxy * np.array([pw / tw, ph / th, pw / tw, ph / th], dtype=np.float32)
+        rows = np.arange(ph, dtype=np.float32)[None, :, None]
+        cols = np.arange(pw, dtype=np.float32)[None, None, :]
+        x1, y1, x2, y2 = (boxes[:, i, None, None] for i in range(4))
+        masks *= (cols >= x1) & (cols < x2) & (rows >= y1) & (rows < y2)
+        out = np.empty((len(idx), nh, nw), dtype=np.uint8)
+        for i, m in enumerate(masks):
+            up = cv2.resize(m, (tw, th), interpolation=cv2.INTER_LINEAR)
+            out[i] = up[top:top + nh, left:left + nw] > 0.5
+        # Boxes back from letterbox input coords to the original image
+        r = nw / image.shape[1]
+        image_boxes = (xyxy - np.array([left, top, left, top], dtype=np.float32)) / r
+        return {"masks": out, "boxes": image_boxes, "scores": scores[idx], "classes": classes[idx].astype(np.float32),
+                "names": names}
+
+    def predict_batch(self, images, conf=0.01):
+        # The exported graph has a fixed batch of 1
+        return [self.predict(image, conf) for image in images]
+
+
+def contours_mask(detections, shape, conf):
+    """Rasterize the editor's contours for the detections above conf, per class"""
+    h, w = shape
+    per_class = {}
+    contours = postprocess(detections, w, h, np.flatnonzero(detections["scores"] >= conf), rules=EDITOR_RULES)
+    for found in contours.values():
+        for cnt, class_name in found:
+            canvas = per_class.setdefault(class_name, np.zeros((h, w), dtype=np.uint8))
+            cv2.fillPoly(canvas, [cnt], 255)
+    return per_class
+
+
+def compare_backends(image, onnx_path=ONNX_PATH, conf=0.6, runs=5):
+    """Parity (per-class IoU of the editor's contours) and median latency, torch vs ONNX"""
+    backends = {"torch": get_segmenter("torch"), "onnx": OnnxSegmenter(onnx_path)}
+    latency = {}
+    masks = {}
+    for name, segmenter in backends.items():
+        segmenter.predict(image, conf)  # warmup
+        times = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            detections = segmenter.predict(image, conf)
+            times.append(time.perf_counter() - start)
+        latency[name] = 1000 * float(np.median(times))
+        masks[name] = contours_mask(detections, image.shape[:2], conf)
+
+    print(f"⏱️ torch {latency['torch']:.0f} ms | onnx {latency['onnx']:.0f} ms "
+          f"({latency['torch'] / max(latency['onnx'], 1e-6):.2f}x)")
+    ious = {}
+    for cls in sorted(set(masks["torch"]) | set(masks["onnx"])):
+        a = masks["torch"].get(cls)
+        b = masks["onnx"].get(cls)
+        if a is None or b is None:
+            ious[cls] = 0.0
+        else:
+            union = np.count_nonzero(a | b)
+            ious[cls] = np.count_nonzero(a & b) / union if union else 1.0
+        print(f"   {cls}: IoU {ious[cls]:.3f}")
+    return latency, ious
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the segmentation model to ONNX and check it against torch")
+    parser.add_argument("--image", required=True, help="house photo to compare on")
+    parser.add_argument("--int8", action="store_true", help="also quantize weights to int8")
+    parser.add_argument("--conf", type=float, default=0.6)
+    args = parser.parse_args()
+
+    path = export_onnx(int8=args.int8)
+    compare_backends(cv2.imread(args.image), path, conf=args.conf)
+    print(f"ℹ️ To use it, set DEFAULT_BACKEND = \"onnx\" and ONNX_MODEL = \"{path}\" in vision_module/model_utils.py")
@@ -0,0 +1,118 @@
+# vision_module/preview_utils.py
+import math
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+PAD = 8  # vertex circles (r=6) and the 3 px mask outline reach this far past a point
+LABEL_RISE = 25  # labels sit 10 px above the first vertex
+
+
+class EditorPreview:
+    """Retained-mode renderer for the contour editor preview.
+
+    Keeps the full-res overlay and mask plus the scaled side-by-side preview between
+    frames. Each frame it asks the ContourStore which rectangles changed, restores the
+    base image there and re-rasterizes only the contours under them, then rescales just
+    that patch. Frames with nothing dirty cost nothing.
+    """
+
+    def __init__(self, image, scale, class_colors):
+        self.image = image
+        self.height, self.width = image.shape[:2]
+        self.scale = scale
+        self.class_colors = class_colors
+        self.label_w = max((cv2.getTextSize(name, FONT, 0.5, 2)[0][0] for name in class_colors), default=0)
+        self.overlay = image.copy()
+        self.mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        # Full-size scratch copies: contours are drawn here in image coordinates, exactly as a full
+        # redraw would rasterize them, and only the dirty rect is copied back
+        self.scratch_overlay = self.overlay.copy()
+        self.scratch_mask = self.mask.copy()
+        self.small_w = max(1, round(self.width * scale))
+        self.small_h = max(1, round(self.height * scale))
+        self.preview = np.zeros((self.small_h, 2 * self.small_w, 3), dtype=np.uint8)
+        self.visible = None
+        self.selected = None  # (idx, pt_idx, x, y) of the highlighted vertex
+
+    def render(self, contours, visible, selected_idx=-1, selected_pt=-1):
+        """Bring the buffers up to date; returns False when nothing changed"""
+        full, rects = contours.take_dirty()
+        if visible != self.visible:
+            self.visible = set(visible)
+            full = True
+
+        selected = None
+        if 0 <= selected_idx < len(contours) and 0 <= selected_pt < len(contours[selected_idx][0]):
+            px, py = contours[selected_idx][0][selected_pt][0]
+            selected = (selected_idx, selected_pt, int(px), int(py))
+        if selected != self.selected:
+            for sel in (self.selected, selected):
+                if sel is not None:
+                    rects.append((sel[2], sel[3], sel[2] + 1, sel[3] + 1))
+            self.selected = selected
+
+        if full:
+            rects = [(0, 0, self.width, self.height)]
+        if not rects:
+            return False
+        for rect in rects:
+            self._redraw(contours, *self._pad(rect))
+        return True
+
+    def full_mask(self, contours):
+        """Mask rasterized from scratch from the current contours, for saving"""
+        mask = np.zeros((self.height, self.width), dtype=np.uint8)
+        for cnt, class_name in contours:
+            if class_name in self.visible:
+                cv2.polylines(mask, [cnt], True, 255, 3)
+        return mask
+
+    def _pad(self, rect):
+        # Grow a touched area by what gets drawn around its points, including a label anchored there
+        x0, y0, x1, y1 = rect
+        return (max(0, x0 - PAD), max(0, y0 - PAD - LABEL_RISE),
+                min(self.width, x1 + PAD + self.label_w), min(self.height, y1 + PAD))
+
+    def _redraw(self, contours, x0, y0, x1, y1):
+        if x1 <= x0 or y1 <= y0:
+            return
+        # Clipping the lines to a sub-view would change their Bresenham paths, so draw whole
+        # contours in image coordinates; the scratch outside the rect is never read
+        overlay, mask = self.scratch_overlay, self.scratch_mask
+        overlay[y0:y1, x0:x1] = self.image[y0:y1, x0:x1]
+        mask[y0:y1, x0:x1] = 0
+
+        # Contours whose outline, vertices or label can reach into the rect, drawn in list order
+        for idx in contours.indices_in_rect(x0 - PAD - self.label_w, y0 - PAD, x1 + PAD, y1 + PAD + LABEL_RISE):
+            cnt, class_name = contours[idx]
+            if class_name not in self.visible:
+                continue
+            color = self.class_colors.get(class_name, (255, 255, 255))
+            cv2.polylines(overlay, [cnt], True, color, 2)
+            cv2.polylines(mask, [cnt], True, 255, 3)
+            for pt_idx, (px, py) in enumerate(cnt.reshape(-1, 2)):
+                if self.selected is not None and (idx, pt_idx) == self.selected[:2]:
+                    cv2.circle(overlay, (int(px), int(py)), 6, (0, 0, 255), -1)
+                else:
+                    cv2.circle(overlay, (int(px), int(py)), 5, (0, 255, 255), -1)
+            x, y = cnt[0][0]
+            cv2.putText(overlay, class_name, (int(x), int(y) - 10), FONT, 0.5, color, 2)
+
+        self.overlay[y0:y1, x0:x1] = overlay[y0:y1, x0:x1]
+        self.mask[y0:y1, x0:x1] = mask[y0:y1, x0:x1]
+        self._rescale(x0, y0, x1, y1)
+
+    def _rescale(self, x0, y0, x1, y1):
+        s = self.scale
+        sx0, sy0 = int(x0 * s), int(y0 * s)
+        sx1, sy1 = min(self.small_w, math.ceil(x1 * s)), min(self.small_h, math.ceil(y1 * s))
+        if sx1 <= sx0 or sy1 <= sy0:
+            return
+        # Source patch that maps exactly onto the destination pixels
+        rows = slice(int(sy0 / s), min(self.height, math.ceil(sy1 / s)))
+        cols = slice(int(sx0 / s), min(self.width, math.ceil(sx1 / s)))
+        size = (sx1 - sx0, sy1 - sy0)
+        self.preview[sy0:sy1, sx0:sx1] = cv2.resize(self.overlay[rows, cols], size, interpolation=cv2.INTER_AREA)
+        mask = cv2.resize(self.mask[rows, cols], size, interpolation=cv2.INTER_AREA)
+        self.preview[sy0:sy1, self.small_w + sx0:self.small_w + sx1] = mask[..., None]
@@ -0,0 +1,111 @@
+# vision_module/scene_utils.py
+import json
+import os
+import cv2
+import numpy as np
+
+STROKE = 3  # outline width in capture pixels, same as the editor's mask
+SUBPIXEL_BITS = 4  # cv2 fixed-point shift, keeps upscaled edges on the true outline
+
+
+def scene_path(mask_path):
+    """mask_dynamic.png -> mask_dynamic.json"""
+    return os.path.splitext(mask_path)[0] + ".json"
+
+
+def save_scene(path, items, shape, stroke=STROKE):
+    """Save [(cnt, class_name, filled), ...] with coordinates normalized to 0..1 of the capture size"""
+    height, width = shape[:2]
+    scale = np.array([width, height], dtype=np.float64)
+    scene = {
+        "width": width,
+        "height": height,
+        "stroke": stroke,
+        "contours": [
+            {"class": class_name, "filled": bool(filled),
+             "points": np.round(cnt.reshape(-1, 2) / scale, 6).tolist()}
+            for cnt, class_name, filled in items
+        ],
+    }
+    with open(path, "w") as f:
+        json.dump(scene, f)
+
+
+class VectorScene:
+    """Edited outlines in normalized coordinates, rasterized at any size on demand"""
+
+    def __init__(self, scene):
+        self.width, self.height = scene["width"], scene["height"]
+        self.stroke = scene.get("stroke", STROKE)
+        self.contours = [(np.array(c["points"], dtype=np.float64), c["class"], c["filled"]) for c in scene["contours"]]
+        self.rasters = {}
+
+    def classes(self):
+        return {class_name for _, class_name, _ in self.contours}
+
+    def rasterize(self, size, thickness=None, classes=None, warp=None):
+        """Binary mask at size=(w, h); memoized per (size, thickness, classes, warp), so treat the result as read-only.
+
+        warp is an optional 3x3 homography between normalized coordinates (e.g. camera -> projector).
+        """
+        w, h = size
+        if thickness is None:
+            # Keep the outline as heavy relative to the picture as it was at capture size
+            thickness = max(1, round(self.stroke * w / self.width))
+        key = (w, h, thickness, frozenset(c.lower() for c in classes) if classes is not None else None,
+               warp.tobytes() if warp is not None else None)
+        if key in self.rasters:
+            return self.rasters[key]
+
+        mask = np.zeros((h, w), dtype=np.uint8)
+        fixed = np.array([w, h], dtype=np.float64) * (1 << SUBPIXEL_BITS)
+        for points, class_name, filled in self.contours:
+            if key[3] is not None and class_name.lower() not in key[3]:
+                continue
+            if warp is not None:
+                points = cv2.perspectiveTransform(points.reshape(-1, 1, 2), warp).reshape(-1, 2)
+            pts = np.round(points * fixed).astype(np.int32).reshape(-1, 1, 2)
+            if filled:
+                cv2.fillPoly(mask, [pts], 255, shift=SUBPIXEL_BITS)
+            else:
+                cv2.polylines(mask, [pts], True, 255, thickness, shift=SUBPIXEL_BITS)
+        self.rasters[key] = mask
+        return mask
+
+
+# Loaded scenes keyed by path and mtime, so their raster caches survive across shows
+_scenes = {}
+
+
+def load_scene(path):
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return None
+    cached = _scenes.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(path) as f:
+            cached = (mtime, VectorScene(json.load(f)))
+        _scenes[path] = cached
+    return cached[1]
+
+
+def fresh_scene(mask_path):
+    """The vector scene saved with this PNG, or None if there is none or it is older than the PNG"""
+    png_mtime = os.path.getmtime(mask_path) if os.path.exists(mask_path) else 0
+    json_path = scene_path(mask_path)
+    # A sidecar older than its PNG belongs to an earlier edit, ignore it
+    if os.path.exists(json_path) and os.path.getmtime(json_path) >= png_mtime:
+        return load_scene(json_path)
+    return None
+
+
+def load_mask(mask_path, size, thickness=None, classes=None):
+    """Mask at size=(w, h): rasterized from the vector scene saved next to the PNG, else the PNG resized"""
+    scene = fresh_scene(mask_path)
+    if scene is not None:
+        return scene.rasterize(size, thickness, classes)
+    mask = cv2.imread(mask_path, cv2.IMREAD_GRAYSCALE)
+    if mask is None:
+        return None
+    return cv2.resize(mask, size)
@@ -0,0 +1,132 @@
+# vision_module/tile_utils.py
+import cv2
+import numpy as np
+from vision_module.model_utils import get_segmenter
+
+
+def tile_grid(width, height, tile=960, overlap=0.2):
+    """(x, y, w, h) tiles covering the image with the given fractional overlap"""
+    tw, th = min(tile, width), min(tile, height)
+    step_x = max(int(tw * (1 - overlap)), 1)
+    step_y = max(int(th * (1 - overlap)), 1)
+    xs = list(range(0, width - tw + 1, step_x))
+    ys = list(range(0, height - th + 1, step_y))
+    # Last row/column hugs the far edge so nothing is left uncovered
+    if xs[-1] + tw < width:
+        xs.append(width - tw)
+    if ys[-1] + th < height:
+        ys.append(height - th)
+    return [(x, y, tw, th) for y in ys for x in xs]
+
+
+def _tile_mask(i, masks, regions, cache):
+    """Instance i's mask at full tile resolution, as bool, resized once"""
+    if i not in cache:
+        _, _, rw, rh = regions[i]
+        cache[i] = cv2.resize(masks[i], (int(rw), int(rh)), interpolation=cv2.INTER_NEAREST) > 0
+    return cache[i]
+
+
+def _merge_groups(boxes, classes, masks, regions, min_overlap):
+    """Union-find grouping of same-class pieces from different tiles whose masks overlap in the shared strip.
+
+    A long trim line cut by tile edges only shares the overlap strip between neighbouring
+    tiles, so box overlap says little; where both tiles saw the same pixels, their masks
+    coincide there. Merging is transitive, so a line across many tiles ends up as one instance.
+    """
+    n = len(boxes)
+    parent = list(range(n))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    cache = {}
+    for i in range(n):
+        ax, ay, aw, ah = regions[i]
+        for j in range(i + 1, n):
+            if classes[i] != classes[j] or regions[i] == regions[j] or find(i) == find(j):
+                continue
+            bx, by, bw, bh = regions[j]
+            # Shared strip of the two tiles, narrowed to where both instances' boxes are
+            x0 = int(np.floor(max(ax, bx, boxes[i, 0], boxes[j, 0])))
+            y0 = int(np.floor(max(ay, by, boxes[i, 1], boxes[j, 1])))
+            x1 = int(np.ceil(min(ax + aw, bx + bw, boxes[i, 2], boxes[j, 2])))
+            y1 = int(np.ceil(min(ay + ah, by + bh, boxes[i, 3], boxes[j, 3])))
+            if x1 <= x0 or y1 <= y0:
+                continue
+            a = _tile_mask(i, masks, regions, cache)[y0 - ay:y1 - ay, x0 - ax:x1 - ax]
+            b = _tile_mask(j, masks, regions, cache)[y0 - by:y1 - by, x0 - bx:x1 - bx]
+            inter = np.count_nonzero(a & b)
+            if inter and inter >= min_overlap * min(np.count_nonzero(a), np.count_nonzero(b)):
+                parent[find(j)] = find(i)
+
+    groups = {}
+    for i in range(n):
+        groups.setdefault(find(i), []).append(i)
+    return [np.array(members) for members in groups.values()]
+
+
+def _merge_masks(members, masks, regions, box):
+    """OR the members' masks together on a canvas covering the union box, at image resolution"""
+    bx0, by0 = int(np.floor(box[0])), int(np.floor(box[1]))
+    bw, bh = int(np.ceil(box[2])) - bx0, int(np.ceil(box[3])) - by0
+    canvas = np.zeros((max(bh, 1), max(bw, 1)), dtype=np.uint8)
+    for m in members:
+        rx, ry, rw, rh = regions[m]
+        full = cv2.resize(masks[m], (int(rw), int(rh)), interpolation=cv2.INTER_NEAREST)
+        x0, y0 = max(rx, bx0), max(ry, by0)
+        x1, y1 = min(rx + rw, bx0 + bw), min(ry + rh, by0 + bh)
+        if x1 <= x0 or y1 <= y0:
+            continue
+        canvas[y0 - by0:y1 - by0, x0 - bx0:x1 - bx0] |= full[y0 - ry:y1 - ry, x0 - rx:x1 - rx]
+    return canvas, (bx0, by0, bw, bh)
+
+
+def detect_tiled(image, conf=0.01, tile=960, overlap=0.2, min_overlap=0.3, backend=None):
+    """Segment a full-resolution capture tile by tile and stitch the instances back together.
+
+    Tiles run as one batch where the backend supports it. Instances seen in several
+    tiles are merged (union mask, best score) when their masks share at least min_overlap
+    of the smaller one's pixels inside the tiles' overlap strip. Returns the same dict as detect(),
+    plus per-instance "regions" telling postprocess which part of the image each mask covers.
+    """
+    h, w = image.shape[:2]
+    tiles = tile_grid(w, h, tile, overlap)
+    results = get_segmenter(backend).predict_batch([image[y:y + th, x:x + tw] for x, y, tw, th in tiles], conf)
+    names = results[0]["names"]
+
+    masks, boxes, scores, classes, regions = [], [], [], [], []
+    for (x, y, tw, th), det in zip(tiles, results):
+        if det["masks"] is None:
+            continue
+        masks.extend(det["masks"])
+        boxes.append(det["boxes"] + np.array([x, y, x, y], dtype=np.float32))
+        scores.append(det["scores"])
+        classes.append(det["classes"])
+        regions.extend([(x, y, tw, th)] * len(det["masks"]))
+    print(f"🧩 {len(tiles)} tiles, {len(masks)} raw instances")
+    if not masks:
+        return {"masks": None, "boxes": np.zeros((0, 4), np.float32), "scores": np.zeros(0, np.float32),
+                "classes": np.zeros(0, np.float32), "names": names, "regions": []}
+
+    boxes, scores, classes = np.concatenate(boxes), np.concatenate(scores), np.concatenate(classes)
+    out = {"masks": [], "boxes": [], "scores": [], "classes": [], "names": names, "regions": []}
+    for members in _merge_groups(boxes, classes, masks, regions, min_overlap):
+        best = members[np.argmax(scores[members])]
+        if len(members) == 1:
+            mask, region, box = masks[best], regions[best], boxes[best]
+        else:
+            box = np.concatenate([boxes[members, :2].min(0), boxes[members, 2:].max(0)])
+            mask, region = _merge_masks(members, masks, regions, box)
+        out["masks"].append(mask)
+        out["boxes"].append(box)
+        out["scores"].append(scores[best])
+        out["classes"].append(classes[best])
+        out["regions"].append(region)
+    for key in ("boxes", "scores", "classes"):
+        out[key] = np.asarray(out[key], dtype=np.float32)
+    print(f"🧩 Stitched into {len(out['masks'])} instances")
+    return out
@@ -1,157 +1,167 @@
 # vision_module/ui_utils.py
 import cv2
 import numpy as np
+import os
+import glob
 import colorsys
-from ultralytics import YOLO
 import subprocess
-
-model = YOLO("vision_module/best.pt")
+from vision_module.model_utils import detect
+from vision_module.contour_utils import EDITOR_RULES, postprocess
+from vision_module.tile_utils import detect_tiled
+from vision_module.index_utils import ContourStore
+from vision_module.preview_utils import EditorPreview
+from vision_module.history_utils import EditHistory, MovePoint, DeletePoint, DeleteContour
+from vision_module.scene_utils import save_scene, scene_path
 
 # === GLOBAL STATE ===
 visible_classes = set()
 selected_contour_idx = -1
 selected_point_idx = -1
 is_dragging = False
-undo_stack = []
+drag_start = None
+history = EditHistory(limit=200)
 
 def generate_class_colors(class_names):
     hsv = [(i / len(class_names), 0.7, 1.0) for i in range(len(class_names))]
     rgb = [tuple(int(c * 255) for c in colorsys.hsv_to_rgb(*h)) for h in hsv]
     return {cls: color for cls, color in zip(class_names, rgb)}
 
+def save_class_masks(contours, shape, visible, mask_dir="class_masks"):
+    """Write one mask_<class>.png (plus its vector scene) per class so each class can get its own animation layer"""
+    os.makedirs(mask_dir, exist_ok=True)
+    class_masks = {}
+    for cnt, class_name in contours:
+        if class_name not in visible:
+            continue
+        if class_name not in class_masks:
+            class_masks[class_name] = np.zeros(shape, dtype=np.uint8)
+        cv2.polylines(class_masks[class_name], [cnt], True, 255, 3)
+    # Drop masks left over from earlier saves for classes that are now hidden or deleted,
+    # otherwise load_class_masks would keep projecting them
+    keep = {f"mask_{class_name.lower()}" for class_name in class_masks}
+    for path in glob.glob(os.path.join(mask_dir, "mask_*.png")) + glob.glob(os.path.join(mask_dir, "mask_*.json")):
+        if os.path.splitext(os.path.basename(path))[0] not in keep:
+            os.remove(path)
+    for class_name, class_mask in class_masks.items():
+        path = os.path.join(mask_dir, f"mask_{class_name.lower()}.png")
+        cv2.imwrite(path, class_mask)
+        save_scene(scene_path(path), [(cnt, cls, False) for cnt, cls in contours if cls == class_name], shape)
+    return list(class_masks)
+
 def mouse_callback(event, x, y, flags, param):
-    global selected_contour_idx, selected_point_idx, is_dragging
+    global selected_contour_idx, selected_point_idx, is_dragging, drag_start
     all_contours, scale = param
-    x, y = int(x * scale), int(y * scale)
+    x, y = int(x / scale), int(y / scale)  # preview is shown at `scale`, map back to image pixels
 
     if event == cv2.EVENT_LBUTTONDOWN:
-        for idx, (cnt, _) in enumerate(all_contours):
-            for pt_idx, pt in enumerate(cnt):
-                px, py = pt[0]
-                if abs(px - x) < 10 and abs(py - y) < 10:
-                    selected_contour_idx = idx
-                    selected_point_idx = pt_idx
-                    is_dragging = True
-                    return
-
-        for idx, (cnt, class_name) in enumerate(all_contours):
-            if cv2.pointPolygonTest(cnt, (x, y), False) >= 0:
-                undo_stack.append(all_contours.copy())
-                print(f"🗑️ Deleted: {class_name}")
-                all_contours.pop(idx)
-                return
+        hit = all_contours.find_vertex(x, y, radius=10)
+        if hit is not None:
+            selected_contour_idx, selected_point_idx = hit
+            px, py = all_contours[selected_contour_idx][0][selected_point_idx][0]
+            drag_start = (int(px), int(py))
+            is_dragging = True
+            return
+
+        idx = all_contours.find_polygon(x, y)
+        if idx is not None:
+            class_name = all_contours[idx][1]
+            history.do(all_contours, DeleteContour(idx, all_contours[idx]))
+            print(f"🗑️ Deleted: {class_name}")
+            return
 
     elif event == cv2.EVENT_LBUTTONUP:
+        if is_dragging and 0 <= selected_contour_idx < len(all_contours):
+            all_contours.refresh_bbox(selected_contour_idx)
+            px, py = all_contours[selected_contour_idx][0][selected_point_idx][0]
+            if (int(px), int(py)) != drag_start:  # one history entry per drag, not per mouse move
+                history.record(MovePoint(selected_contour_idx, selected_point_idx, drag_start, (int(px), int(py))))
         is_dragging = False
 
     elif event == cv2.EVENT_MOUSEMOVE and is_dragging:
         if 0 <= selected_contour_idx < len(all_contours):
-            cnt, class_name = all_contours[selected_contour_idx]
-            cnt[selected_point_idx][0] = [x, y]
+            all_contours.move_point(selected_contour_idx, selected_point_idx, x, y)
 
-def launch_editor(image, initial_conf=0.6):
+def launch_editor(image, initial_conf=0.6, tiled=False):
     # Launch on-screen keyboard
     keyboard_proc = subprocess.Popen(["matchbox-keyboard"])
     global visible_classes, selected_contour_idx, selected_point_idx, is_dragging
     height, width = image.shape[:2]
     window_name = "Preview"
-    scale = 0.5
+    scale = min(0.5, 640 / width)  # keep full-resolution captures on screen
 
     cv2.namedWindow(window_name)
     cv2.createTrackbar("Confidence", window_name, int(initial_conf * 100), 100, lambda x: None)
 
 
+    # One inference at the slider's floor; moving the slider only filters these by score
+    detections = detect_tiled(image, conf=0.01) if tiled else detect(image, conf=0.01)
+    contour_cache = {}
+
     def get_yolo_contours(conf):
-        results = model.predict(source=image, conf=conf, verbose=False, task='segment')
         contours = []
-        mask_img = np.zeros((height, width), dtype=np.uint8)
-        names = list(results[0].names.values())
-
-        if results[0].masks is not None:
-            for i, mask in enumerate(results[0].masks.data):
-                class_id = int(results[0].boxes.data[i][5])
-                class_name = results[0].names[class_id]
-                resized_mask = cv2.resize(mask.cpu().numpy().astype(np.uint8) * 255, (width, height))
-                cnts, _ = cv2.findContours(resized_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-                for cnt in cnts:
-                    if cv2.contourArea(cnt) < 100:
-                        continue
-                    epsilon = 0.005 * cv2.arcLength(cnt, True)
-                    if class_name.lower() == "window":
-                        x, y, w, h = cv2.boundingRect(cnt)
-                        ar = w / float(h)
-                        fill = cv2.contourArea(cnt) / float(w * h)
-                        if 0.4 < ar < 2.5 and fill > 0.5:
-                            rect = np.array([[[x, y]], [[x+w, y]], [[x+w, y+h]], [[x, y+h]]])
-                            contours.append((rect, class_name))
-                            continue
-                    elif class_name.lower() == "trim":
-                        smooth = cv2.approxPolyDP(cnt, epsilon, False)
-                        contours.append((smooth, class_name))
-                        continue
-                    smooth = cv2.approxPolyDP(cnt, epsilon, True)
-                    contours.append((smooth, class_name))
-        return contours, names
-
-    contours, class_names = get_yolo_contours(initial_conf)
+        selected = np.flatnonzero(detections["scores"] >= conf)
+        # Post-process every newly selected detection in one batch, then reuse it
+        contour_cache.update(postprocess(detections, width, height, [i for i in selected if i not in contour_cache],
+                                         rules=EDITOR_RULES))
+        for i in selected:
+            # Hand out copies so drags don't leak into the cache
+            contours.extend((cnt.copy(), class_name) for cnt, class_name in contour_cache[i])
+        return contours, list(detections["names"].values())
+
+    initial_contours, class_names = get_yolo_contours(initial_conf)
+    history.clear()
+    contours = ContourStore(initial_contours)  # keeps a spatial index so clicks stay cheap
     visible_classes = set(class_names)
     class_colors = generate_class_colors(class_names)
     cv2.setMouseCallback(window_name, mouse_callback, param=(contours, scale))
+    preview = EditorPreview(image, scale, class_colors)
 
     last_conf = initial_conf
 
     while True:
         conf_slider = cv2.getTrackbarPos("Confidence", window_name) / 100.0
         if abs(conf_slider - last_conf) > 0.001:
-            print(f"🔁 Rerunning YOLO at confidence {conf_slider:.2f}")
+            print(f"🔁 Filtering detections at confidence {conf_slider:.2f}")
             new_contours, _ = get_yolo_contours(conf_slider)
             contours[:] = new_contours  # ✅ in-place update
+            history.clear()  # recorded edits refer to the old contour list
             selected_contour_idx = -1
             selected_point_idx = -1
             is_dragging = False
             last_conf = conf_slider
 
-        overlay = image.copy()
-        mask = np.zeros((height, width), dtype=np.uint8)
-
-        for idx, (cnt, class_name) in enumerate(contours):
-            if class_name not in visible_classes:
-                continue
-            color = class_colors.get(class_name, (255, 255, 255))
-            cv2.polylines(overlay, [cnt], True, color, 2)
-            cv2.polylines(mask, [cnt], True, 255, 3)
-            for pt_idx, pt in enumerate(cnt):
-                px, py = pt[0]
-                if idx == selected_contour_idx and pt_idx == selected_point_idx:
-                    cv2.circle(overlay, (px, py), 6, (0, 0, 255), -1)
-                else:
-                    cv2.circle(overlay, (px, py), 5, (0, 255, 255), -1)
-            x, y = cnt[0][0]
-            cv2.putText(overlay, class_name, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
-
-        preview = cv2.hconcat([overlay, cv2.cvtColor(mask, cv2.COLOR_GRAY2BGR)])
-        preview_small = cv2.resize(preview, (0, 0), fx=scale, fy=scale)
-        cv2.imshow(window_name, preview_small)
+        # Only the areas touched since the last frame are redrawn; idle frames skip imshow entirely
+        if preview.render(contours, visible_classes, selected_contour_idx, selected_point_idx):
+            cv2.imshow(window_name, preview.preview)
         if cv2.getWindowProperty(window_name, cv2.WND_PROP_VISIBLE) < 1:
             break
 
         key = cv2.waitKey(50)
         if key == ord("s"):
-            cv2.imwrite("mask_dynamic.png", mask)
-            cv2.imwrite("overlay_dynamic_final.png", overlay)
-            print("✅ Saved mask and overlay.")
+            # The projection is driven by this file, so rasterize it fresh rather than trust the patched preview
+            cv2.imwrite("mask_dynamic.png", preview.full_mask(contours))
+            # Resolution-independent copy of the same outlines for the projector side
+            save_scene(scene_path("mask_dynamic.png"), [(cnt, cls, False) for cnt, cls in contours if cls in visible_classes],
+                       (height, width))
+            cv2.imwrite("overlay_dynamic_final.png", preview.overlay)
+            save_class_masks(contours, (height, width), visible_classes)
+            print("✅ Saved mask, class masks and overlay.")
         elif key == 27:
             break
-        elif key == ord("z") and undo_stack:
-            contours[:] = undo_stack.pop()
-            print("↩️ Undo last action")
+        elif key == ord("z"):
+            if history.undo(contours):
+                print("↩️ Undo last action")
+            selected_contour_idx = selected_point_idx = -1
+        elif key == ord("y"):
+            if history.redo(contours):
+                print("↪️ Redo last action")
+            selected_contour_idx = selected_point_idx = -1
         elif key == ord("d"):
             if selected_contour_idx >= 0 and selected_point_idx >= 0:
                 cnt, class_name = contours[selected_contour_idx]
                 if len(cnt) > 3:
-                    undo_stack.append(contours.copy())
-                    cnt = np.delete(cnt, selected_point_idx, axis=0)
-                    contours[selected_contour_idx] = (cnt, class_name)
+                    point = cnt[selected_point_idx].copy()
+                    history.do(contours, DeletePoint(selected_contour_idx, selected_point_idx, point))
                     print("❌ Deleted point from contour")
                 selected_point_idx = -1
                 selected_contour_idx = -1
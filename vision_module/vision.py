@@ -1,10 +1,13 @@
 import cv2
 import numpy as np
 import colorsys
-from ultralytics import YOLO
+from vision_module.model_utils import MODEL_PATH, get_model
+from vision_module.capture_utils import get_camera
+from vision_module.index_utils import ContourStore
+from vision_module.history_utils import EditHistory, MovePoint, DeletePoint, DeleteContour
+from vision_module.scene_utils import save_scene, scene_path
 from gpiozero import Servo, Button
 from gpiozero.pins.pigpio import PiGPIOFactory
-from time import sleep
 
 
 factory = PiGPIOFactory()
@@ -13,7 +16,7 @@ factory = PiGPIOFactory()
 # ===============================
 # GLOBAL SETUP
 # ===============================
-model = YOLO("best.pt")
+model = get_model(MODEL_PATH)
 # image_path = "mom_house_final.png"
 # original_img = cv2.imread(image_path)
 # original_img = capture_image()
@@ -21,26 +24,21 @@ model = YOLO("best.pt")
 # resized_img = cv2.resize(original_img, (640, 640))
 
 window_name = "Preview"
+PREVIEW_SCALE = 0.5  # preview is shown at this fraction of the capture size
 current_conf = 0.6
 visible_classes = set()
 selected_contour_idx = -1
 selected_point_idx = -1
 is_dragging = False
 last_slider_conf = -1  # to detect slider changes
-undo_stack = []
+drag_start = None
+history = EditHistory(limit=200)
 
-# Take a live picture from the Pi camera
+# Take a live picture from the Pi camera (kept open and warm by the capture service)
 def capture_image():
-    cap = cv2.VideoCapture(0)  # 0 = default Pi camera
-    sleep(2)  # Give time for camera to warm up
-    ret, frame = cap.read()
-    cap.release()
-    if ret:
-        cv2.imwrite("captured_image.jpg", frame)
-        print("📷 Photo button pressed — running YOLO again")
-        return frame
-    else:
-        raise Exception("Failed to capture image")
+    frame = get_camera().capture()  # the camera service archives a timestamped copy
+    print("📷 Photo button pressed — running YOLO again")
+    return frame
     
 original_img = capture_image()
 original_height, original_width = original_img.shape[:2]
@@ -74,40 +72,43 @@ def nothing(x):
 # ===============================
 # INTERACTION STORAGE
 # ===============================
-all_contours = []  # List of (cnt, class_name)
+all_contours = ContourStore()  # (cnt, class_name) pairs plus a spatial index for clicks
 mouse_x, mouse_y = -1, -1
 
 # ===============================
 # MOUSE EVENTS
 # ===============================
 def mouse_callback(event, x, y, flags, param):
-    global selected_contour_idx, selected_point_idx, is_dragging, mouse_x, mouse_y
-    mouse_x, mouse_y = x * 2, y * 2
+    global selected_contour_idx, selected_point_idx, is_dragging, mouse_x, mouse_y, drag_start
+    mouse_x, mouse_y = int(x / PREVIEW_SCALE), int(y / PREVIEW_SCALE)
 
     if event == cv2.EVENT_LBUTTONDOWN:
-        for idx, (cnt, _) in enumerate(all_contours):
-            for pt_idx, pt in enumerate(cnt):
-                px, py = pt[0]
-                if abs(px - mouse_x) < 10 and abs(py - mouse_y) < 10:
-                    selected_contour_idx = idx
-                    selected_point_idx = pt_idx
-                    is_dragging = True
-                    return
-
-        for idx, (cnt, class_name) in enumerate(all_contours):
-            if cv2.pointPolygonTest(cnt, (mouse_x, mouse_y), False) >= 0:
-                undo_stack.append(list(all_contours))
-                print(f"🗑️ Deleted: {class_name}")
-                all_contours.pop(idx)
-                return
+        hit = all_contours.find_vertex(mouse_x, mouse_y, radius=10)
+        if hit is not None:
+            selected_contour_idx, selected_point_idx = hit
+            px, py = all_contours[selected_contour_idx][0][selected_point_idx][0]
+            drag_start = (int(px), int(py))
+            is_dragging = True
+            return
+
+        idx = all_contours.find_polygon(mouse_x, mouse_y)
+        if idx is not None:
+            class_name = all_contours[idx][1]
+            history.do(all_contours, DeleteContour(idx, all_contours[idx]))
+            print(f"🗑️ Deleted: {class_name}")
+            return
 
     elif event == cv2.EVENT_LBUTTONUP:
+        if is_dragging and 0 <= selected_contour_idx < len(all_contours):
+            all_contours.refresh_bbox(selected_contour_idx)
+            px, py = all_contours[selected_contour_idx][0][selected_point_idx][0]
+            if (int(px), int(py)) != drag_start:
+                history.record(MovePoint(selected_contour_idx, selected_point_idx, drag_start, (int(px), int(py))))
         is_dragging = False
 
     elif event == cv2.EVENT_MOUSEMOVE and is_dragging:
         if 0 <= selected_contour_idx < len(all_contours):
-            cnt, class_name = all_contours[selected_contour_idx]
-            cnt[selected_point_idx][0] = [mouse_x, mouse_y]
+            all_contours.move_point(selected_contour_idx, selected_point_idx, mouse_x, mouse_y)
 
 # ===============================
 # INITIALIZATION
@@ -129,8 +130,7 @@ def update_contours(conf):
     selected_contour_idx = -1
     selected_point_idx = -1
     is_dragging = False
-    global all_contours
-    all_contours = []
+    found = []
     results = model.predict(source=resized_img, conf=conf, verbose=False, task='segment')
     if results[0].masks is not None:
         for i, mask in enumerate(results[0].masks.data):
@@ -144,7 +144,9 @@ def update_contours(conf):
                 if cv2.contourArea(cnt) > 100:
                     epsilon = 0.01 * cv2.arcLength(cnt, True)
                     smoothed_cnt = cv2.approxPolyDP(cnt, epsilon, True)
-                    all_contours.append((smoothed_cnt, class_name))
+                    found.append((smoothed_cnt, class_name))
+    all_contours.replace_all(found)
+    history.clear()  # recorded edits refer to the old contour list
 
 # Initial load
 update_contours(current_conf)
@@ -161,12 +163,14 @@ while True:
 
     overlay_img = original_img.copy()
     mask_img = np.zeros((original_height, original_width), dtype=np.uint8)
+    scene_items = []  # what went into mask_img, as (cnt, class_name, filled)
 
     for idx, (cnt, class_name) in enumerate(all_contours):
         color = class_colors.get(class_name, (255, 255, 255))
         if class_name.lower() == "trim":
             cv2.drawContours(overlay_img, [cnt], -1, color, thickness=cv2.FILLED)
             cv2.drawContours(mask_img, [cnt], -1, 255, thickness=cv2.FILLED)
+            scene_items.append((cnt, class_name, True))
         elif class_name.lower() == "window":
             x, y, w, h = cv2.boundingRect(cnt)
             aspect_ratio = w / float(h)
@@ -175,14 +179,17 @@ while True:
                 rect = np.array([[[x, y]], [[x + w, y]], [[x + w, y + h]], [[x, y + h]]])
                 cv2.polylines(overlay_img, [rect], True, color, 2)
                 cv2.polylines(mask_img, [rect], True, 255, 3)
+                scene_items.append((rect, class_name, False))
                 continue
             cv2.polylines(overlay_img, [cnt], True, color, 2)
             cv2.polylines(mask_img, [cnt], True, 255, 3)
+            scene_items.append((cnt, class_name, False))
         else:
             cv2.polylines(overlay_img, [cnt], True, color, 2)
             x, y = cnt[0][0]
             cv2.putText(overlay_img, class_name, (x, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.6, color, 2)
             cv2.polylines(mask_img, [cnt], True, 255, 3)
+            scene_items.append((cnt, class_name, False))
 
         for pt_idx, pt in enumerate(cnt):
             px, py = pt[0]
@@ -192,17 +199,35 @@ while True:
                 cv2.circle(overlay_img, (px, py), 5, (0, 255, 255), -1)
 
     preview = cv2.hconcat([overlay_img, cv2.cvtColor(mask_img, cv2.COLOR_GRAY2BGR)])
-    preview_small = cv2.resize(preview, (0, 0), fx=0.5, fy=0.5)
+    preview_small = cv2.resize(preview, (0, 0), fx=PREVIEW_SCALE, fy=PREVIEW_SCALE)
     cv2.imshow(window_name, preview_small)
 
     key = cv2.waitKey(50)
 
     if key == ord("s"):
         cv2.imwrite("mask_dynamic_final.png", mask_img)
+        save_scene(scene_path("mask_dynamic_final.png"), scene_items, mask_img.shape)
         cv2.imwrite("overlay_dynamic_final.png", overlay_img)
         print("✅ Saved mask and overlay.")
     elif key == 27:
         break
+    elif key == ord("z"):
+        if history.undo(all_contours):
+            print("↩️ Undo last action")
+        selected_contour_idx = selected_point_idx = -1
+    elif key == ord("y"):
+        if history.redo(all_contours):
+            print("↪️ Redo last action")
+        selected_contour_idx = selected_point_idx = -1
+    elif key == ord("d"):
+        if selected_contour_idx >= 0 and selected_point_idx >= 0:
+            cnt, class_name = all_contours[selected_contour_idx]
+            if len(cnt) > 3:
+                point = cnt[selected_point_idx].copy()
+                history.do(all_contours, DeletePoint(selected_contour_idx, selected_point_idx, point))
+                print("❌ Deleted point from contour")
+            selected_point_idx = -1
+            selected_contour_idx = -1
     elif key != -1:
         char_pressed = chr(key).lower()
         toggle = [cls for cls in class_names if cls.lower().startswith(char_pressed)]
@@ -215,19 +240,6 @@ while True:
                 visible_classes.add(cls)
                 print(f"👁️ Showing: {cls}")
             update_contours(current_conf)
-    elif key == ord("z") and undo_stack:
-        all_contours = undo_stack.pop()
-        print("↩️ Undo last action")
-    elif key == ord("d"):
-        if selected_contour_idx >= 0 and selected_point_idx >= 0:
-            cnt, class_name = all_contours[selected_contour_idx]
-            if len(cnt) > 3:
-                undo_stack.append(list(all_contours))
-                cnt = np.delete(cnt, selected_point_idx, axis=0)
-                all_contours[selected_contour_idx] = (cnt, class_name)
-                print("❌ Deleted point from contour")
-            selected_point_idx = -1
-            selected_contour_idx = -1
 
 
 cv2.destroyAllWindows()